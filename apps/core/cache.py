@@ -0,0 +1,63 @@
+from hashlib import md5
+from uuid import uuid4
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+def is_shared_cache():
+    """Return whether the default cache is shared by server processes, so a deleted entry is gone for all of them"""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+
+def _data_version_key(user_id):
+    return f'data-version:{user_id}'
+
+
+def get_data_version(user_id):
+    """Return the current version of the user's data, which changes whenever any of it is written"""
+    key = _data_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_data_version(*user_ids):
+    """Change the data version of users, so their cached responses are not used anymore
+
+    Versions are changed right away and once more when the current transaction commits, so a response computed
+    concurrently from not yet committed data isn't cached under the new version.
+    """
+    user_ids = set(filter(None, user_ids))
+    if not user_ids:
+        return
+
+    def bump():
+        cache.set_many({_data_version_key(user_id): uuid4().hex for user_id in user_ids}, None)
+    bump()
+    transaction.on_commit(bump)
+
+
+def response_cache_key(user_id, path):
+    return f'response:{user_id}:{get_data_version(user_id)}:{md5(path.encode()).hexdigest()}'
+
+
+def count_response_cache(hit):
+    key = HITS_KEY if hit else MISSES_KEY
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def response_cache_stats():
+    counters = cache.get_many((HITS_KEY, MISSES_KEY))
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None}
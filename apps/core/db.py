@@ -0,0 +1,18 @@
+from django.db import transaction
+
+
+def update_returning(queryset, returning, **values):
+    """Update rows of `queryset` like `queryset.update(**values)` and return `returning` fields of updated rows
+
+    Rows are returned as tuples of values, converted by the ORM. Matching rows are locked, updated by their primary
+    keys and read again in the same transaction, so rows matched by a concurrent update are never returned twice.
+    Django has no public API for `UPDATE ... RETURNING`, so no single statement is built by hand.
+    """
+    using = queryset.db
+    with transaction.atomic(using=using):
+        pks = list(queryset.select_for_update(of=('self', )).values_list('pk', flat=True))
+        if not pks:
+            return []
+        updated_rows = queryset.model._base_manager.using(using).filter(pk__in=pks)
+        updated_rows.update(**values)
+        return list(updated_rows.values_list(*returning))
@@ -0,0 +1,115 @@
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+from .utils import percentile
+
+
+# Metrics of the request being handled, None when instrumentation is disabled or outside of a request
+current_metrics = ContextVar('current_metrics', default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize `sql` so queries differing only in their parameters, or the length of `IN` lists, are equal"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.wall_time = 0.0
+        self.fingerprints = Counter()
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper recording every query, see `connection.execute_wrapper()`"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def finish(self):
+        self.wall_time = time.perf_counter() - self.started
+
+    def duplicates(self):
+        """Return `(fingerprint, count)` of queries executed more than once, the most repeated first"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    def server_timing(self):
+        duplicated = sum(count for _, count in self.duplicates())
+        return ', '.join((
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries, {duplicated} duplicated"',
+            f'serializer;dur={self.serializer_time * 1000:.1f}',
+            f'total;dur={self.wall_time * 1000:.1f}',
+        ))
+
+
+class RouteStats:
+    """Rolling window of the last `window` requests' metrics of every route, shared by the threads of a process"""
+    FIELDS = ('wall_time', 'sql_time', 'serializer_time', 'queries')
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+
+    def add(self, route, metrics):
+        with self._lock:
+            self._samples[route].append(tuple(getattr(metrics, field) for field in self.FIELDS))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            samples = {route: list(route_samples) for route, route_samples in self._samples.items()}
+        summary = {}
+        for route, route_samples in sorted(samples.items()):
+            route_summary = {'count': len(route_samples)}
+            for index, field in enumerate(self.FIELDS):
+                values = [sample[index] for sample in route_samples]
+                if field.endswith('_time'):
+                    values = [value * 1000 for value in values]
+                    field = field.replace('_time', '_ms')
+                route_summary[f'{field}_p50'] = round(percentile(values, 50), 3)
+                route_summary[f'{field}_p95'] = round(percentile(values, 95), 3)
+            summary[route] = route_summary
+        return summary
+
+
+route_stats = RouteStats()
+
+
+class InstrumentedSerializerMixin:
+    """Add the time spent in `to_representation()` to the current request's serializer time
+
+    Nested instrumented serializers are counted once, as part of their outermost serializer.
+    """
+    def to_representation(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializing = False
@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.core.services import SendQueuedEmailsService
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails of the outbox, once or continuously with --loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Number of emails claimed at once')
+        parser.add_argument('--workers', type=int, default=4, help='Number of threads sending emails')
+        parser.add_argument('--max-attempts', type=int, default=5, help='Number of attempts before giving up')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox for due emails')
+        parser.add_argument('--interval', type=float, default=1, help='Seconds to wait when the outbox is empty')
+
+    def handle(self, *args, **options):
+        service = SendQueuedEmailsService(
+            batch_size=options['batch_size'], workers=options['workers'], max_attempts=options['max_attempts']
+        )
+        while True:
+            sent, failed = service.execute()
+            if sent or failed:
+                self.stdout.write(f'{sent} email(s) sent, {failed} failed')
+            if not options['loop']:
+                break
+            if sent + failed < service.batch_size:
+                time.sleep(options['interval'])
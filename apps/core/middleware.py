@@ -0,0 +1,58 @@
+import logging
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from .instrumentation import RequestMetrics, current_metrics, route_stats
+
+
+logger = logging.getLogger('apps.core.instrumentation')
+
+
+class InstrumentationMiddleware:
+    """Record query count, SQL time, duplicated queries, serializer time and wall time of every request
+
+    Enabled by `INSTRUMENTATION_ENABLED`. Metrics are sent back as a `Server-Timing` header, added to the rolling
+    per-route stats served to staff by `/api/v1/instrumentation/stats/`, and requests slower than
+    `INSTRUMENTATION_SLOW_REQUEST_MS` or running more than `INSTRUMENTATION_MAX_QUERIES` queries are logged with
+    their query fingerprints.
+    """
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        route_stats.window = settings.INSTRUMENTATION_WINDOW
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        metrics.finish()
+        response['Server-Timing'] = metrics.server_timing()
+        route = self.get_route(request)
+        if route:
+            route_stats.add(route, metrics)
+        if (metrics.wall_time * 1000 > settings.INSTRUMENTATION_SLOW_REQUEST_MS
+                or metrics.queries > settings.INSTRUMENTATION_MAX_QUERIES):
+            self.log_slow_request(request, route, metrics)
+        return response
+
+    def get_route(self, request):
+        match = request.resolver_match
+        if match is None:
+            return None
+        return f'{request.method} {match.view_name}'
+
+    def log_slow_request(self, request, route, metrics):
+        fingerprints = '\n'.join(f'  {count} x {sql}' for sql, count in metrics.fingerprints.most_common())
+        logger.warning(
+            'Slow request %s (%s): %.1f ms, %d queries in %.1f ms, serializer %.1f ms\n%s',
+            request.get_full_path(), route, metrics.wall_time * 1000, metrics.queries, metrics.sql_time * 1000,
+            metrics.serializer_time * 1000, fingerprints
+        )
@@ -1,8 +1,16 @@
+import time
+from hashlib import md5
 from uuid import uuid4
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.utils.text import slugify
+from rest_framework.response import Response
+from django.conf import settings
 from django.core.cache import cache
+from .cache import count_response_cache, is_shared_cache, response_cache_key
 
 
 class SingletonMixin:
@@ -13,6 +21,12 @@ class SingletonMixin:
     and only instance of the model. This singleton is based on db models primary key, so the python instances will is
     not exactly the same as each other (their `id` is different), but it's garantee that it's always the same model
     in database.
+
+    The loaded instance is kept in process memory. `load()` compares its `updated_at` with the one of the database row,
+    at most once every `SINGLETON_VERSION_CHECK_INTERVAL` milliseconds, and reads the whole row again only when they
+    differ, so every process sees a save within that interval. A saved instance replaces the loaded one when its
+    transaction commits. Models using it must be `Timestampable`. The same instance is returned to every caller of
+    the process, so don't change it without saving it.
     """
     class Meta:
         abstract = True
@@ -20,21 +34,31 @@ class SingletonMixin:
     def save(self, *args, **kwargs):
         self.pk = 1
         super(SingletonMixin, self).save(*args, **kwargs)
-        self._set_cache()
+        cls = self.__class__
+        _loaded_singletons.pop(cls, None)
+        # Kept in memory once committed, so a rolled back save is not kept
+        transaction.on_commit(lambda: _loaded_singletons.__setitem__(cls, (self, time.monotonic())))
 
     @classmethod
     def load(cls):
-        if cache.get(cls.__name__) is None:
-            obj, created = cls.objects.get_or_create(pk=1)
-            if not created:
-                obj._set_cache()
-        return cache.get(cls.__name__)
+        now = time.monotonic()
+        instance, checked_at = _loaded_singletons.get(cls, (None, None))
+        if instance is not None:
+            if (now - checked_at) * 1000 < settings.SINGLETON_VERSION_CHECK_INTERVAL:
+                return instance
+            if cls.objects.filter(pk=1).values_list('updated_at', flat=True).first() != instance.updated_at:
+                instance = None
+        if instance is None:
+            instance, _ = cls.objects.get_or_create(pk=1)
+        _loaded_singletons[cls] = (instance, now)
+        return instance
 
     def delete(self, *args, **kwargs):
         raise AttributeError("You cannot delete an instance of {} model".format(self.__class__.__name__))
 
-    def _set_cache(self):
-        cache.set(self.__class__.__name__, self)
+
+# Instances loaded by `SingletonMixin.load()` in this process, as `{model: (instance, checked at)}`
+_loaded_singletons = {}
 
 
 class Timestampable(models.Model):
@@ -63,11 +87,18 @@ class LogicalDeletable(models.Model):
 
     def delete(self, using=None, keep_parents=False):
         self.is_deleted = True
-        self.save(update_fields=['is_deleted'])
+        self._save_is_deleted()
 
     def restore(self):
         self.is_deleted = False
-        self.save(update_fields=['is_deleted'])
+        self._save_is_deleted()
+
+    def _save_is_deleted(self):
+        update_fields = ['is_deleted']
+        if isinstance(self, Timestampable):
+            # Conditional requests listing deleted rows are validated by `updated_at`
+            update_fields.append('updated_at')
+        self.save(update_fields=update_fields)
 
 
 class Activable(models.Model):
@@ -95,19 +126,37 @@ class Permalinkable(models.Model):
         kwargs.update(getattr(self, 'url_kwargs', {}))
         return kwargs
 
+    # Number of times a generated slug is allocated again when a concurrent save takes it first
+    slug_allocation_attempts = 5
+
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
-        if not self.slug:
+        if self.slug:
+            return super().save(force_insert, force_update, using, update_fields)
+        for attempt in range(self.slug_allocation_attempts):
             self.slug = self._create_slug()
-        return super().save(force_insert, force_update, using, update_fields)
+            try:
+                with transaction.atomic(using=using):
+                    return super().save(force_insert, force_update, using, update_fields)
+            except IntegrityError:
+                slug_taken = self._meta.model._base_manager.using(using).filter(slug=self.slug).exists()
+                self.slug = ''
+                if not slug_taken or attempt == self.slug_allocation_attempts - 1:
+                    raise
 
     def _create_slug(self):
-            index = 0
-            model = self._meta.model
-            slug = slugify(self.slug_source, allow_unicode=True)
-            while model.objects.filter(slug=slug).exists():
-                index += 1
-                slug = slugify(f"{self.slug_source}_{index}", allow_unicode=True)
-            return slug
+        """Return the slug of `slug_source`, suffixed by `_1`, `_2`, ... if it is taken, using a single query
+
+        Sources without any slug character, like `!!!`, get a short random slug.
+        """
+        base = slugify(self.slug_source, allow_unicode=True) or uuid4().hex[:8]
+        taken = set(self._meta.model._base_manager.filter(
+            Q(slug=base) | Q(slug__startswith=f'{base}_')
+        ).values_list('slug', flat=True))
+        slug, index = base, 0
+        while slug in taken:
+            index += 1
+            slug = f'{base}_{index}'
+        return slug
 
     @property
     def slug_source(self):
@@ -145,4 +194,85 @@ class MultipleFieldLookupMixin:
         obj = get_object_or_404(queryset, **filter)
         self.check_object_permissions(self.request, obj)
         return obj
-    
+
+
+class ConditionalGetMixin:
+    """Answer conditional `list()` and `retrieve()` requests with `304 Not Modified` without serializing anything
+
+    List validators are the latest `updated_at` and the number of rows of the listed queryset, computed by a single
+    aggregate query, and hashed into an `ETag` along with the user, the full path (filters and cursor) and the
+    accepted media type. Lists don't send `Last-Modified`, as deleting a row changes their count but not their latest
+    `updated_at`. Detail responses are validated by the object's `updated_at`. Anything that changes the serialized
+    data must update `updated_at`, or override `get_list_validators()` and `get_object_timestamps()`.
+    """
+    def list(self, request, *args, **kwargs):
+        last_modified, count = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+        etag = self._make_etag(last_modified.isoformat() if last_modified else '', count)
+        not_modified = get_conditional_response(request, etag=etag)
+        response = not_modified or super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = max(self.get_object_timestamps(instance))
+        etag = self._make_etag(instance.pk, last_modified.isoformat())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+        if not_modified:
+            response = not_modified
+        else:
+            response = Response(self.get_serializer(instance).data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def get_list_validators(self, queryset):
+        """Return the latest modification time (or None) and the number of rows of `queryset`"""
+        stats = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+        return stats['last_modified'], stats['count']
+
+    def get_object_timestamps(self, instance):
+        """Return modification times of everything serialized along with `instance`"""
+        return [instance.updated_at]
+
+    def _make_etag(self, *validators):
+        request = self.request
+        key = ':'.join(str(part) for part in (
+            request.user.pk, request.get_full_path(), request.accepted_media_type, *validators
+        ))
+        return quote_etag(md5(key.encode()).hexdigest())
+
+
+class CachedResponseMixin:
+    """Serve `list()` and `retrieve()` responses from the cache, keyed by the user's data version and the full path
+
+    Any write of the user's data bumps the version (see `apps.core.cache.bump_data_version()`), so cached responses
+    are never invalidated one by one. Cached responses keep their `ETag`, to answer conditional requests from the cache
+    as well. Apply it before `ConditionalGetMixin`.
+
+    Versions must be shared by all server processes, so responses are only cached when the default cache backend is
+    shared (see `apps.core.cache.is_shared_cache()`) and `RESPONSE_CACHE_TIMEOUT` is set.
+    """
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, view, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_TIMEOUT or not is_shared_cache():
+            return view(request, *args, **kwargs)
+        key = response_cache_key(request.user.pk, f'{request.get_full_path()}:{request.accepted_media_type}')
+        cached = cache.get(key)
+        count_response_cache(hit=cached is not None)
+        if cached is not None:
+            etag, data = cached
+            response = get_conditional_response(request, etag=etag) or Response(data)
+        else:
+            response = view(request, *args, **kwargs)
+            etag = response.get('ETag')
+            if response.status_code == 200:
+                cache.set(key, (etag, response.data), settings.RESPONSE_CACHE_TIMEOUT)
+        if etag:
+            response['ETag'] = etag
+        return response
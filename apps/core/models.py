@@ -1,3 +1,47 @@
 from django.db import models
+from django.utils import timezone
+from .mixins import Timestampable
 
-# Create your models here.
+
+class OutgoingEmailQuerySet(models.QuerySet):
+    def enqueue(self, subject, message, from_email, recipient_list):
+        """Queue an email to be sent by `manage.py send_queued_emails`, like `send_mail()` would send it
+
+        It is written in the current transaction, so it is sent only if the transaction commits.
+        """
+        return self.create(subject=subject, message=message, from_email=from_email, recipients=list(recipient_list))
+
+    def due(self, now=None):
+        return self.filter(status=OutgoingEmail.QUEUED, next_attempt_at__lte=now or timezone.now())
+
+
+class OutgoingEmail(Timestampable, models.Model):
+    """An email of the outbox
+
+    Queued emails are claimed by pushing their `next_attempt_at` forward, so an email claimed by a crashed worker is
+    tried again once the claim expires. Failed attempts are retried with an exponential backoff until `FAILED`.
+    """
+    QUEUED = 'queued'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = ((QUEUED, 'Queued'), (SENT, 'Sent'), (FAILED, 'Failed'))
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    objects = OutgoingEmailQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'outgoing_email'
+        indexes = [
+            models.Index(fields=('status', 'next_attempt_at'), name='outgoing_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)} ({self.status})"
@@ -0,0 +1,55 @@
+from django.http import JsonResponse
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination over `(created_at, id)`, newest first
+
+    Pages are fetched with a `created_at < cursor` condition instead of an OFFSET, so every page takes the same time
+    to load however deep it is. `id` breaks ties between rows created at the same instant. Page size defaults to the
+    `PAGE_SIZE` setting and can be set by clients through the `page_size` query parameter.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class AsyncCreatedAtCursorPagination(CreatedAtCursorPagination):
+    """`CreatedAtCursorPagination` of async views, fetching pages with the async ORM
+
+    Cursors, `next` and `previous` links and the response body are those of the sync pagination, so a cursor of
+    either list can be followed on the other.
+    """
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of `CursorPagination.paginate_queryset()`, which only differs by reading the page"""
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            order = self.ordering[0]
+            lookup = 'lt' if self.cursor.reverse != order.startswith('-') else 'gt'
+            queryset = queryset.filter(**{f'{order.lstrip("-")}__{lookup}': current_position})
+
+        results = [row async for row in queryset[offset:offset + self.page_size + 1].aiterator()]
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+        )
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position, self.previous_position = following_position, current_position
+        return self.page
+
+    def get_paginated_response(self, data):
+        return JsonResponse(super().get_paginated_response(data).data)
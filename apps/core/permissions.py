@@ -1,15 +1,19 @@
 from rest_framework.permissions import BasePermission
 
 class IsObjectCreator(BasePermission):
-    """Check if user is owner of the object"""
+    """Check if user is owner of the object
+
+    `field` is a `__` separated path to the owner foreign key. Intermediate objects are read with `getattr`, so they
+    should be fetched by `select_related()`, and the owner is compared by its id, so it is never loaded.
+    """
     def __init__(self, field=None):
         self.field = field or 'created_by'
 
     def has_object_permission(self, request, view, obj):
         prev_result = super().has_object_permission(request, view, obj)
-        fields = self.field.split('__')
+        *fields, owner_field = self.field.split('__')
         for field in fields:
             obj = getattr(obj, field)
-        result =  obj == request.user
+        result = getattr(obj, f'{owner_field}_id') == request.user.pk
         return prev_result & result
 
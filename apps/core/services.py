@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .base import AbstractService
+from .models import OutgoingEmail
+
+
+class SendQueuedEmailsService(AbstractService):
+    """Send a batch of due emails of the outbox and return the number of sent and failed emails
+
+    Emails are claimed and their results recorded by the calling thread, while `workers` threads send them, each one
+    over a single connection of the email backend. A failed email is tried again after `retry_delay`, doubled on every
+    failed attempt, and marked as failed after `max_attempts` attempts.
+    """
+    batch_size = 100
+    workers = 4
+    max_attempts = 5
+    retry_delay = timedelta(seconds=30)
+    # How long a claimed email is hidden from other workers, in case this one dies before recording the result
+    claim_timeout = timedelta(minutes=5)
+
+    def execute(self):
+        emails = self._claim()
+        if not emails:
+            return 0, 0
+        chunks = [emails[index::self.workers] for index in range(self.workers)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = [result for chunk_results in executor.map(self._send, chunks) for result in chunk_results]
+        return self._record(results)
+
+    def _claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            due = OutgoingEmail.objects.due(now).order_by('next_attempt_at', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            emails = list(due[:self.batch_size])
+            OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=now + self.claim_timeout
+            )
+        return emails
+
+    def _send(self, emails):
+        """Send `emails` over one connection and return `(email, error)` tuples, runs in a worker thread"""
+        results = []
+        if not emails:
+            return results
+        backend = get_connection()
+        try:
+            backend.open()
+        except Exception as error:
+            return [(email, error) for email in emails]
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.message, email.from_email, email.recipients, connection=backend
+                )
+                try:
+                    message.send()
+                    results.append((email, None))
+                except Exception as error:
+                    results.append((email, error))
+        finally:
+            backend.close()
+        return results
+
+    def _record(self, results):
+        now = timezone.now()
+        sent = [email.pk for email, error in results if error is None]
+        failed = []
+        for email, error in results:
+            if error is None:
+                continue
+            email.attempts += 1
+            email.last_error = f'{type(error).__name__}: {error}'
+            email.updated_at = now
+            if email.attempts >= self.max_attempts:
+                email.status = OutgoingEmail.FAILED
+            else:
+                email.next_attempt_at = now + self.retry_delay * 2 ** (email.attempts - 1)
+            failed.append(email)
+        with transaction.atomic():
+            OutgoingEmail.objects.filter(pk__in=sent).update(
+                status=OutgoingEmail.SENT, sent_at=now, updated_at=now, attempts=F('attempts') + 1
+            )
+            OutgoingEmail.objects.bulk_update(
+                failed, ('attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at')
+            )
+        return len(sent), len(failed)
@@ -0,0 +1,19 @@
+import atexit
+import shutil
+import tempfile
+from django.test import override_settings
+
+
+def override_shared_cache():
+    """Return `override_settings()` of a file based cache in a new temporary directory
+
+    The default memory cache is process-local, so `is_shared_cache()` keeps tokens and responses out of it. Decorate
+    a test class (or method) by `@override_shared_cache()` to cache them, in a directory of its own which is removed
+    once tests exit.
+    """
+    location = tempfile.mkdtemp(prefix='tracker-tests-cache-')
+    atexit.register(shutil.rmtree, location, ignore_errors=True)
+    return override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': location,
+    }})
@@ -0,0 +1,172 @@
+from datetime import datetime
+from unittest import mock
+from django.core import mail
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.project.models import Project, Task, TaskTimeEntry
+from apps.user.models import User
+from .db import update_returning
+from .instrumentation import fingerprint, route_stats
+from .models import OutgoingEmail
+from .services import SendQueuedEmailsService
+
+
+class UpdateReturningTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(email="dummy_email@gmail.com")
+        self.project = Project.objects.create(title="Project A", created_by=user)
+        self.task_a = Task.objects.create(title="Task A", project=self.project)
+        self.task_b = Task.objects.create(title="Task B", project=self.project)
+        self.task_a.start()
+        self.task_b.start()
+        self.end = timezone.make_aware(datetime(2030, 1, 1))
+
+    def _update(self):
+        return update_returning(
+            TaskTimeEntry.objects.filter(task__project=self.project, task__title="Task A"),
+            ('task_id', 'created_at', 'end_datetime'),
+            end_datetime=self.end
+        )
+
+    def test_update_returns_converted_values(self):
+        rows = self._update()
+        self.assertEqual(rows, [(self.task_a.pk, self.task_a.running_since, self.end)])
+        self.assertEqual(TaskTimeEntry.objects.filter(end_datetime=self.end).count(), 1)
+
+    def test_update_returns_updated_values_of_expressions(self):
+        rows = update_returning(
+            Task.objects.filter(project=self.project), ('pk', 'accumulated_seconds'),
+            accumulated_seconds=F('accumulated_seconds') + 5
+        )
+        self.assertEqual(sorted(rows), sorted([(self.task_a.pk, 5), (self.task_b.pk, 5)]))
+
+    def test_nothing_matched_is_not_updated(self):
+        with CaptureQueriesContext(connection) as context:
+            rows = update_returning(TaskTimeEntry.objects.filter(task__title="Task C"), ('pk', ), end_datetime=self.end)
+        self.assertEqual(rows, [])
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in context.captured_queries))
+
+
+class FingerprintTests(TestCase):
+    def test_parameters_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "task"  WHERE "id" IN (%s, %s, %s) AND "title" = \'a\' LIMIT 21'),
+            fingerprint('SELECT * FROM "task" WHERE "id" IN (%s) AND "title" = \'b\' LIMIT 1'),
+        )
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True, INSTRUMENTATION_SLOW_REQUEST_MS=10000, INSTRUMENTATION_MAX_QUERIES=100)
+class InstrumentationMiddlewareTests(APITestCase):
+    def setUp(self):
+        route_stats.clear()
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True, is_staff=True)
+        for index in range(3):
+            Project.objects.create(title=f"Project {index}", created_by=self.user)
+        self.client.force_authenticate(self.user)
+
+    @override_settings(INSTRUMENTATION_MAX_QUERIES=1)
+    def test_metrics_are_sent_as_server_timing(self):
+        with self.assertLogs('apps.core.instrumentation', 'WARNING') as logs:
+            response = self.client.get(reverse('project:project_apis-list'))
+        server_timing = response['Server-Timing']
+        self.assertIn('db;dur=', server_timing)
+        self.assertIn('serializer;dur=', server_timing)
+        self.assertIn('total;dur=', server_timing)
+        self.assertIn('Slow request /api/v1/projects/', logs.output[0])
+        self.assertIn('1 x SELECT', logs.output[0])
+
+    def test_stats_are_collected_per_route(self):
+        self.client.get(reverse('project:project_apis-list'))
+        self.client.get(reverse('project:project_apis-list'))
+        stats = self.client.get(reverse('core:instrumentation_stats')).data
+        route = stats['GET project:project_apis-list']
+        self.assertEqual(route['count'], 2)
+        self.assertGreater(route['queries_p95'], 0)
+        self.assertGreater(route['serializer_ms_p95'], 0)
+
+    def test_stats_are_for_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse('core:instrumentation_stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class InstrumentationDisabledTests(APITestCase):
+    def test_no_server_timing_when_disabled(self):
+        user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.client.force_authenticate(user)
+        self.assertNotIn('Server-Timing', self.client.get(reverse('project:project_apis-list')))
+
+
+class PermalinkableTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com")
+
+    def _create_project(self, title="Sprint"):
+        return Project.objects.create(title=title, created_by=self.user)
+
+    def test_next_free_suffix_is_allocated_with_a_single_query(self):
+        slugs = [self._create_project().slug for _ in range(3)]
+        self.assertEqual(slugs, ['sprint', 'sprint_1', 'sprint_2'])
+        project = Project(title="Sprint", created_by=self.user)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(project._create_slug(), 'sprint_3')
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_only_suffixes_of_the_slug_are_read(self):
+        self._create_project(title="Sprint planning")
+        self._create_project(title="Sprint_a")
+        self._create_project()
+        with mock.patch.object(Project._base_manager, 'filter', wraps=Project._base_manager.filter) as filter_slugs:
+            self.assertEqual(Project(title="Sprint", created_by=self.user)._create_slug(), 'sprint_1')
+        self.assertEqual(
+            set(Project.objects.filter(*filter_slugs.call_args.args).values_list('slug', flat=True)),
+            {'sprint', 'sprint_a'}
+        )
+
+    def test_titles_without_slug_characters_get_a_random_slug(self):
+        slugs = {self._create_project(title="!!!").slug for _ in range(2)}
+        self.assertEqual(len(slugs), 2)
+        self.assertNotIn('', slugs)
+
+    def test_slug_is_allocated_again_when_taken_concurrently(self):
+        self._create_project()
+        real_create_slug = Project._create_slug
+        with mock.patch.object(Project, '_create_slug', autospec=True, side_effect=[
+            'sprint', real_create_slug(Project(title="Sprint"))
+        ]):
+            project = self._create_project()
+        self.assertEqual(project.slug, 'sprint_1')
+
+
+class SendQueuedEmailsServiceTests(TestCase):
+    def setUp(self):
+        for index in range(3):
+            OutgoingEmail.objects.enqueue(f"Subject {index}", "Message", "admin@tracker.com", [f"user{index}@mail.com"])
+
+    def test_due_emails_are_sent_once(self):
+        self.assertEqual(SendQueuedEmailsService(workers=2).execute(), (3, 0))
+        self.assertEqual(sorted(message.subject for message in mail.outbox), ["Subject 0", "Subject 1", "Subject 2"])
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.SENT).count(), 3)
+        self.assertEqual(SendQueuedEmailsService().execute(), (0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failed_emails_are_retried_with_backoff(self):
+        service = SendQueuedEmailsService(max_attempts=2)
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=ConnectionError("Relay is down")):
+            self.assertEqual(service.execute(), (0, 3))
+        email = OutgoingEmail.objects.first()
+        self.assertEqual((email.status, email.attempts), (OutgoingEmail.QUEUED, 1))
+        self.assertIn("Relay is down", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(service.execute(), (0, 0))
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=ConnectionError("Relay is down")):
+            self.assertEqual(service.execute(), (0, 3))
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.FAILED).count(), 3)
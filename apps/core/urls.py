@@ -0,0 +1,11 @@
+from django.urls import path
+from .views import InstrumentationStatsView, ResponseCacheStatsView
+
+
+app_name = 'core'
+
+
+urlpatterns = [
+    path('cache/stats/', ResponseCacheStatsView.as_view(), name='response_cache_stats'),
+    path('instrumentation/stats/', InstrumentationStatsView.as_view(), name='instrumentation_stats'),
+]
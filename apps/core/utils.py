@@ -0,0 +1,7 @@
+import math
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of `values`"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
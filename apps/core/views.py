@@ -1,3 +1,23 @@
-from django.shortcuts import render
+from rest_framework import views, response
+from rest_framework.permissions import IsAdminUser
+from .cache import response_cache_stats
+from .instrumentation import route_stats
 
-# Create your views here.
+
+class InstrumentationStatsView(views.APIView):
+    """p50/p95 of wall time, SQL time, serializer time and query count per route, since this process started
+
+    Stats are collected by `InstrumentationMiddleware` and are local to each server process.
+    """
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        return response.Response(route_stats.summary())
+
+
+class ResponseCacheStatsView(views.APIView):
+    """Hits and misses of the response cache, shared by all processes using the same cache backend"""
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        return response.Response(response_cache_stats())
@@ -0,0 +1,81 @@
+"""Async versions of the read-heavy endpoints, served next to the sync viewsets
+
+They answer the same data as their sync counterparts with the async ORM, so under ASGI a request waiting for the
+database doesn't hold a worker thread. They only support token authentication and GET.
+"""
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.request import Request
+from apps.core.pagination import AsyncCreatedAtCursorPagination
+from apps.user.authentication import CachedTokenAuthentication
+from .models import Project, Task
+from .serializers import ProjectSeriailzer, TaskSerializer
+
+
+def async_api_view(view):
+    """Allow GET only and authenticate the request by its token, answering 401 if it is missing or invalid
+
+    Django's view decorators cannot wrap async views before Django 5.0.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return HttpResponseNotAllowed(['GET'])
+        try:
+            result = await sync_to_async(CachedTokenAuthentication().authenticate)(request)
+        except AuthenticationFailed as error:
+            result, message = None, str(error.detail)
+        else:
+            message = 'Authentication credentials were not provided.'
+        if result is None:
+            return JsonResponse({'detail': message}, status=401)
+        request.user = result[0]
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def paginated_response(request, queryset, serializer_class):
+    paginator = AsyncCreatedAtCursorPagination()
+    try:
+        rows = await paginator.apaginate_queryset(queryset, Request(request))
+    except NotFound as error:
+        raise Http404(error.detail)
+    return paginator.get_paginated_response(serializer_class(rows, many=True).data)
+
+
+@async_api_view
+async def project_list(request):
+    projects = Project.objects.user_projects(request.user).select_related('created_by')
+    if not request.GET.get('deleted'):
+        projects = projects.non_deleted()
+    return await paginated_response(request, projects, ProjectSeriailzer)
+
+
+@async_api_view
+async def task_list(request, project_uuid):
+    try:
+        await Project.objects.user_projects(request.user).aget(uuid=project_uuid)
+    except Project.DoesNotExist:
+        raise Http404('No Project matches the given query.')
+    tasks = Task.objects.filter(
+        project__uuid=project_uuid, project__created_by=request.user
+    ).with_tracking_stats()
+    return await paginated_response(request, tasks, TaskSerializer)
+
+
+@async_api_view
+async def timer_status(request):
+    """Running tasks of the user, with the time tracked so far"""
+    running_tasks = Task.objects.filter(
+        project__created_by=request.user, running_since__isnull=False
+    ).select_related('project').order_by('-running_since')
+    timers = [{
+        'task': str(task.uuid),
+        'task_title': task.title,
+        'project': str(task.project.uuid),
+        'running_since': task.running_since.isoformat(),
+        'duration': task.get_total_spent_time(include_running_task=True),
+    } async for task in running_tasks.aiterator()]
+    return JsonResponse({'count': len(timers), 'timers': timers})
@@ -0,0 +1,129 @@
+import asyncio
+import time
+import tracemalloc
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.core.cache import bump_data_version
+from apps.core.utils import percentile
+from .models import Project, ProjectSetting, TaskTimeEntry
+from .services import SeedTrackerService
+
+
+class TrackerBenchmark:
+    """Measure the hot endpoints of the tracker against seeded data
+
+    A size `n` seeds one user owning `n` projects of `n` tasks with `n` finished time entries each. For every endpoint,
+    p50/p95 latency and query count are collected over `iterations` requests and peak memory is measured by one more
+    request under `tracemalloc`, so its overhead doesn't affect latencies. Lists are measured cold: the user's data
+    version is bumped before each request, so they are never served from the response cache.
+
+    Throughput of the sync viewsets and their async versions is compared by sending `throughput_requests` requests,
+    `concurrency` at a time, through the ASGI handler of this process, i.e. a single worker. Sync responses may come
+    from the response cache, like in production.
+    """
+    def __init__(self, iterations=20, concurrency=10, throughput_requests=200):
+        self.iterations = iterations
+        self.concurrency = concurrency
+        self.throughput_requests = throughput_requests
+
+    def run(self, size):
+        user = SeedTrackerService(users=1, projects_per_user=size, tasks=size, entries=size).execute()[0]
+        setting = ProjectSetting.load()
+        setting.concurrent_tasks = True
+        setting.save()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {user.auth_token.key}')
+        project = Project.objects.user_projects(user).first()
+        task = project.tasks.first()
+        task_kwargs = {'project__uuid': project.uuid, 'uuid': task.uuid}
+        stop_all_url = reverse('project:project_apis-stop-all-tasks', kwargs={'uuid': project.uuid})
+        start_url = reverse('project:task_apis-start', kwargs=task_kwargs)
+        stop_url = reverse('project:task_apis-stop', kwargs=task_kwargs)
+
+        def start_all():
+            for task in project.tasks.all():
+                task.start()
+
+        def expire_cached_responses():
+            bump_data_version(user.pk)
+
+        endpoints = {
+            'project_list': (lambda: client.get(reverse('project:project_apis-list')), expire_cached_responses),
+            'task_list': (
+                lambda: client.get(reverse('project:task_apis-list', kwargs={'project__uuid': project.uuid})),
+                expire_cached_responses,
+            ),
+            'task_start': (lambda: client.patch(start_url), lambda: TaskTimeEntry.objects.filter(task=task).finish_running()),
+            'task_stop': (lambda: client.patch(stop_url), task.start),
+            'stop_all_tasks': (lambda: client.put(stop_all_url), start_all),
+            'login': (lambda: APIClient().post(reverse('user:login'), {
+                'username': user.username, 'password': SeedTrackerService.password
+            }), None),
+            'profile': (lambda: client.get(reverse('user:profile')), None),
+        }
+        latency = {name: self.measure(request, setup) for name, (request, setup) in endpoints.items()}
+
+        task.start()
+        task_list_kwargs = {'project__uuid': project.uuid}
+        throughput_urls = {
+            'project_list': (reverse('project:project_apis-list'), reverse('project:async_project_list')),
+            'task_list': (
+                reverse('project:task_apis-list', kwargs=task_list_kwargs),
+                reverse('project:async_task_list', kwargs={'project_uuid': project.uuid}),
+            ),
+            'timer_status': (None, reverse('project:async_timer_status')),
+        }
+        throughput = {}
+        for name, (sync_url, async_url) in throughput_urls.items():
+            throughput[name] = {'async_rps': self.measure_throughput(async_url, user.auth_token.key)}
+            if sync_url:
+                throughput[name]['sync_rps'] = self.measure_throughput(sync_url, user.auth_token.key)
+        return {'latency': latency, 'throughput': throughput}
+
+    def measure(self, request, setup=None):
+        latencies, queries = [], []
+        for _ in range(self.iterations + 1):
+            if setup:
+                setup()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = request()
+                latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code < 400, f'{response.status_code}: {getattr(response, "data", "")}'
+            queries.append(len(context.captured_queries))
+        # The first request warms up caches and is not counted
+        latencies, queries = latencies[1:], queries[1:]
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            request()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'queries': max(queries),
+            'peak_memory_kb': round(peak_memory / 1024, 1),
+        }
+
+    def measure_throughput(self, url, token):
+        """Return the requests per second served for `url` by the ASGI handler of this process"""
+        async def load():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def get():
+                async with semaphore:
+                    response = await client.get(url, AUTHORIZATION=f'Token {token}')
+                assert response.status_code == 200, f'{url}: {response.status_code}'
+
+            started = time.perf_counter()
+            await asyncio.gather(*(get() for _ in range(self.throughput_requests)))
+            return self.throughput_requests / (time.perf_counter() - started)
+        return round(async_to_sync(load)(), 1)
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import threading
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class LocalEventBroker:
+    """Publish timer events to subscribers of the same process
+
+    This is the default backend of `TIMER_EVENTS_BROKER`. A backend for several workers (e.g. over Redis pub/sub)
+    implements the same `publish()`, `subscribe()` and `unsubscribe()` methods and delivers published events to the
+    local subscribers of every worker.
+    """
+    # Events of a subscriber which doesn't keep up are dropped, its client will resynchronize on reconnection
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, user_id, event):
+        """Send `event` to the subscribers of `user_id`, can be called from any thread"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:
+                # The loop of the subscriber is closed, so it will never unsubscribe
+                self._discard(user_id, loop, queue)
+
+    def subscribe(self, user_id):
+        """Return an `asyncio.Queue` receiving events of `user_id`, must be called from the consuming event loop"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        self._discard(user_id, asyncio.get_running_loop(), queue)
+
+    def _discard(self, user_id, loop, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.discard((loop, queue))
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    @staticmethod
+    def _put(queue, event):
+        if not queue.full():
+            queue.put_nowait(event)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.TIMER_EVENTS_BROKER)()
+    return _broker
+
+
+def publish_timer_event(user_id, event, **data):
+    """Publish a timer event of the user once the current transaction commits"""
+    payload = {'event': event, **data}
+    transaction.on_commit(lambda: get_broker().publish(user_id, payload))
+
+
+def format_sse(event):
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n".encode()
@@ -2,4 +2,7 @@ class NoRunningTaskFoundException(Exception):
     pass
 
 class CuncurrentTaskException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class InvalidImportRow(Exception):
+    pass
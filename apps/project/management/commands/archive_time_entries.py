@@ -0,0 +1,19 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.project.services import ArchiveTimeEntriesService
+
+
+class Command(BaseCommand):
+    help = 'Move time entries which ended more than --days days ago to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='Retention horizon of live time entries, in days')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Number of time entries moved per batch')
+
+    def handle(self, *args, **options):
+        service = ArchiveTimeEntriesService(
+            before=timezone.now() - timedelta(days=options['days']), batch_size=options['batch_size']
+        )
+        archived = service.execute()
+        self.stdout.write(self.style.SUCCESS(f'{archived} time entries archived'))
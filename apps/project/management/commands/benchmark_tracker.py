@@ -0,0 +1,64 @@
+import json
+import platform
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from apps.project.benchmark import TrackerBenchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot endpoints against seeded data of several sizes in a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='5,20', help='Comma separated data sizes, a size n seeds n projects x n tasks x n entries'
+        )
+        parser.add_argument('--iterations', type=int, default=20, help='Number of measured requests per endpoint')
+        parser.add_argument(
+            '--concurrency', type=int, default=10, help='Number of concurrent requests of throughput measurements'
+        )
+        parser.add_argument(
+            '--throughput-requests', type=int, default=200, help='Number of requests of throughput measurements'
+        )
+        parser.add_argument('--output', help='Path of the JSON report, printed to stdout if not given')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        benchmark = TrackerBenchmark(
+            iterations=options['iterations'],
+            concurrency=options['concurrency'],
+            throughput_requests=options['throughput_requests'],
+        )
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = {}
+            for size in sizes:
+                self.stderr.write(f'Benchmarking size {size}...')
+                call_command('flush', interactive=False, verbosity=0)
+                results[str(size)] = benchmark.run(size)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        report = json.dumps({
+            'environment': {
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'created_at': timezone.now().isoformat(),
+            },
+            'iterations': options['iterations'],
+            'concurrency': options['concurrency'],
+            'throughput_requests': options['throughput_requests'],
+            'results': results,
+        }, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(report + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,50 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from apps.project.parsers import CSVParser, NDJSONParser
+from apps.project.services import ImportTimeEntriesService
+from apps.user.models import User
+
+
+class Command(BaseCommand):
+    help = 'Import finished time entries of a user from a CSV or NDJSON file with project, task, start and end columns'
+    parsers = {
+        'csv': CSVParser,
+        'ndjson': NDJSONParser,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the file to import')
+        parser.add_argument('--user', required=True, help='Email of the user who owns the imported entries')
+        parser.add_argument(
+            '--format', choices=self.parsers.keys(), help='Format of the file, guessed from its extension by default'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of rows to insert per transaction')
+        parser.add_argument(
+            '--no-create', action='store_true', help='Reject rows of unknown projects and tasks instead of creating them'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in self.parsers:
+            raise CommandError(f'Unknown format `{file_format}`, use --format to set it')
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist as e:
+            raise CommandError(f"User `{options['user']}` not found") from e
+
+        with path.open(newline='', encoding='utf-8') as lines:
+            service = ImportTimeEntriesService(
+                user=user,
+                rows=self.parsers[file_format]().iter_rows(lines),
+                batch_size=options['batch_size'],
+                create_missing=not options['no_create'],
+            )
+            result = service.execute()
+
+        for rejection in result.rejected:
+            self.stderr.write(f'Line {rejection.line}: {rejection.error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.imported} time entries imported, {len(result.rejected)} rejected '
+            f'in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s)'
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.project.services import RebuildTaskTrackingService
+
+
+class Command(BaseCommand):
+    help = "Rebuild tasks' running_since and accumulated_seconds columns from their time entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of tasks to process per batch')
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only report out of sync tasks and exit with an error if there is any, without writing anything'
+        )
+
+    def handle(self, *args, **options):
+        service = RebuildTaskTrackingService(batch_size=options['batch_size'], commit=not options['verify'])
+        mismatches = service.execute()
+        if options['verify']:
+            if mismatches:
+                raise CommandError(f'{mismatches} task(s) are out of sync with their time entries')
+            self.stdout.write(self.style.SUCCESS('All tasks are in sync with their time entries'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{mismatches} task(s) rebuilt'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from apps.project.services import SeedTrackerService
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, projects, tasks and time entries for development and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1, help='Number of users to create')
+        parser.add_argument('--projects-per-user', type=int, default=10, help='Number of projects per user')
+        parser.add_argument('--tasks', type=int, default=10, help='Number of tasks per project')
+        parser.add_argument('--entries', type=int, default=10, help='Number of finished time entries per task')
+        parser.add_argument('--password', default=SeedTrackerService.password, help='Password of created users')
+
+    def handle(self, *args, **options):
+        users = SeedTrackerService(
+            users=options['users'],
+            projects_per_user=options['projects_per_user'],
+            tasks=options['tasks'],
+            entries=options['entries'],
+            password=options['password'],
+        ).execute()
+        for user in users:
+            self.stdout.write(user.email)
+        self.stdout.write(self.style.SUCCESS(f"{len(users)} user(s) created with password {options['password']}"))
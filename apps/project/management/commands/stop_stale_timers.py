@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.project.services import StopStaleTimersService
+
+
+class Command(BaseCommand):
+    help = 'Stop running tasks older than their auto_stop_after limit, once or periodically with --loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of time entries stopped at once')
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping stale timers every --interval')
+        parser.add_argument('--interval', type=float, default=60, help='Seconds to wait between sweeps')
+
+    def handle(self, *args, **options):
+        service = StopStaleTimersService(batch_size=options['batch_size'])
+        while True:
+            stopped = service.execute()
+            if stopped:
+                self.stdout.write(f'{stopped} stale timer(s) stopped')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+def populate_tracking_columns(apps, schema_editor):
+    Task = apps.get_model('project', 'Task')
+    TaskTimeEntry = apps.get_model('project', 'TaskTimeEntry')
+    tasks = {}
+    for task_id, start, end in TaskTimeEntry.objects.values_list('task_id', 'created_at', 'end_datetime').iterator():
+        task = tasks.setdefault(task_id, Task(pk=task_id, running_since=None, accumulated_seconds=0))
+        if end is None:
+            task.running_since = max(filter(None, (task.running_since, start)))
+        else:
+            task.accumulated_seconds += int((end - start).total_seconds())
+    Task.objects.bulk_update(tasks.values(), ['running_since', 'accumulated_seconds'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='accumulated_seconds',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='running_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_tracking_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0003_task_tracking_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='project_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='task_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktimeentry',
+            index=models.Index(fields=['task', '-created_at', '-id'], name='time_entry_task_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0004_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tasktimeentry',
+            index=models.Index(condition=models.Q(('end_datetime__isnull', True)), fields=['task'], name='time_entry_open_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:14
+
+from django.db import migrations, models
+from django.db.models import Count, F
+import django.db.models.deletion
+
+
+def close_duplicate_open_entries(apps, schema_editor):
+    """Leave a single open entry per task, closing older ones when the latest one was started"""
+    Task = apps.get_model('project', 'Task')
+    TaskTimeEntry = apps.get_model('project', 'TaskTimeEntry')
+    duplicates = TaskTimeEntry.objects.filter(end_datetime__isnull=True).values('task_id').annotate(
+        count=Count('id')
+    ).filter(count__gt=1)
+    for duplicate in duplicates:
+        latest, *older_entries = TaskTimeEntry.objects.filter(
+            task_id=duplicate['task_id'], end_datetime__isnull=True
+        ).order_by('-created_at', '-id')
+        seconds = 0
+        for entry in older_entries:
+            entry.end_datetime = latest.created_at
+            entry.save(update_fields=['end_datetime'])
+            seconds += int((entry.end_datetime - entry.created_at).total_seconds())
+        Task.objects.filter(pk=duplicate['task_id']).update(
+            accumulated_seconds=F('accumulated_seconds') + seconds, running_since=latest.created_at
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0005_open_time_entry_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tasktimeentry',
+            name='time_entry_open_idx',
+        ),
+        migrations.AddField(
+            model_name='tasktimeentry',
+            name='exclusive_project',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.project'),
+        ),
+        migrations.RunPython(close_duplicate_open_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tasktimeentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_datetime__isnull', True)), fields=('task',), name='time_entry_one_open_per_task'),
+        ),
+        migrations.AddConstraint(
+            model_name='tasktimeentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_datetime__isnull', True)), fields=('exclusive_project',), name='time_entry_one_exclusive_open_per_project'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def log_existing_objects(apps, schema_editor):
+    """Log every existing project, task and time entry, so clients syncing from scratch receive them"""
+    ChangeLogEntry = apps.get_model('project', 'ChangeLogEntry')
+    kinds = (
+        ('project', apps.get_model('project', 'Project').objects.values_list('created_by_id', 'uuid')),
+        ('task', apps.get_model('project', 'Task').objects.values_list('project__created_by_id', 'uuid')),
+        (
+            'time_entry',
+            apps.get_model('project', 'TaskTimeEntry').objects.values_list('task__project__created_by_id', 'uuid')
+        ),
+    )
+    for kind, rows in kinds:
+        batch = []
+        for user_id, object_uuid in rows.order_by('pk').iterator(chunk_size=2000):
+            batch.append(ChangeLogEntry(user_id=user_id, kind=kind, object_uuid=object_uuid))
+            if len(batch) == 2000:
+                ChangeLogEntry.objects.bulk_create(batch)
+                batch = []
+        ChangeLogEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('project', '0006_one_open_entry_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('task', 'Task'), ('time_entry', 'Time entry')], max_length=16)),
+                ('object_uuid', models.UUIDField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'change_log',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['user', 'id'], name='change_log_user_idx'),
+        ),
+        migrations.RunPython(log_existing_objects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0007_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='auto_stop_after',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectsetting',
+            name='auto_stop_after',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TimerAutoStop',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('limit', models.DurationField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('time_entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.tasktimeentry')),
+            ],
+            options={
+                'db_table': 'timer_auto_stop',
+            },
+        ),
+    ]
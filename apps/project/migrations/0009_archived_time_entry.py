@@ -0,0 +1,37 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:37
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0008_timer_auto_stop'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='archived_duration',
+            field=models.DurationField(default=datetime.timedelta(0)),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTimeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField()),
+                ('start_datetime', models.DateTimeField()),
+                ('end_datetime', models.DateTimeField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_time_entries', to='project.task')),
+            ],
+            options={
+                'db_table': 'archived_time_entry',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedtimeentry',
+            index=models.Index(fields=['task', 'start_datetime'], name='archived_entry_task_start_idx'),
+        ),
+    ]
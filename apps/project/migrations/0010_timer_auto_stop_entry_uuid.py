@@ -0,0 +1,39 @@
+# Generated by Django 4.1.1 on 2026-10-18 03:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_time_entry_uuids(apps, schema_editor):
+    TaskTimeEntry = apps.get_model('project', 'TaskTimeEntry')
+    TimerAutoStop = apps.get_model('project', 'TimerAutoStop')
+    TimerAutoStop.objects.update(time_entry_uuid=Subquery(
+        TaskTimeEntry.objects.filter(pk=OuterRef('time_entry_id')).values('uuid')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0009_archived_time_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timerautostop',
+            name='time_entry_uuid',
+            field=models.UUIDField(null=True),
+        ),
+        migrations.RunPython(fill_time_entry_uuids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='timerautostop',
+            name='time_entry_uuid',
+            field=models.UUIDField(),
+        ),
+        migrations.AlterField(
+            model_name='timerautostop',
+            name='time_entry',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='project.tasktimeentry'),
+        ),
+    ]
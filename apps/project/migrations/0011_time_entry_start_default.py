@@ -0,0 +1,19 @@
+# Generated by Django 4.1.1 on 2026-10-18 03:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0010_timer_auto_stop_entry_uuid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tasktimeentry',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,6 +1,12 @@
-from django.db import models
-from django.db.models import Case, When, F, Sum
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, Count, When, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from .exceptions import CuncurrentTaskException
+from .signals import time_entries_finished, time_entries_started
+from apps.core.db import update_returning
 from apps.core.mixins import (
     LogicalDeletable, Permalinkable, Timestampable, SingletonMixin, Authorable, NonSequentialIdentifierMixin,
     LogicalDeletableQuerySet
@@ -9,6 +15,9 @@ from apps.core.mixins import (
 
 class ProjectSetting(Timestampable, SingletonMixin, models.Model):
     concurrent_tasks = models.BooleanField(default=False)
+    # Running entries older than this are stopped by `manage.py stop_stale_timers`, unless their project sets its own
+    # limit. Null disables it.
+    auto_stop_after = models.DurationField(null=True, blank=True)
 
     class Meta:
         db_table = 'project_setting'
@@ -18,6 +27,24 @@ class ProjectQuerySet(LogicalDeletableQuerySet, models.QuerySet):
     def user_projects(self, user):
         return self.filter(created_by=user)
 
+    def with_stats(self):
+        """Annotate projects with `task_count`, `running_task_count`, `total_seconds` (tracked by finished entries)
+        and `last_activity_at` (latest `updated_at` of their tasks)
+
+        Each one is a correlated subquery over the project's tasks, so projects are still listed by a single query.
+        """
+        tasks = Task.objects.filter(project=OuterRef('pk')).order_by().values('project')
+
+        def task_aggregate(aggregate):
+            return Subquery(tasks.annotate(value=aggregate).values('value'))
+
+        return self.annotate(
+            task_count=Coalesce(task_aggregate(Count('pk')), 0),
+            running_task_count=Coalesce(task_aggregate(Count('pk', filter=Q(running_since__isnull=False))), 0),
+            total_seconds=Coalesce(task_aggregate(Sum('accumulated_seconds')), 0),
+            last_activity_at=task_aggregate(Max('updated_at')),
+        )
+
 
 class Project(
     NonSequentialIdentifierMixin,
@@ -27,89 +54,242 @@ class Project(
     Authorable,
     models.Model):
     title = models.CharField(max_length=255)
+    # Overrides `ProjectSetting.auto_stop_after` for the tasks of this project
+    auto_stop_after = models.DurationField(null=True, blank=True)
     objects = ProjectQuerySet.as_manager()
 
     class Meta:
         ordering = ('-created_at', )
+        indexes = [
+            models.Index(fields=('created_by', '-created_at', '-id'), name='project_owner_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def get_all_tasks_with_duration(self):
-        return self.tasks.annotate(duration=Sum(F("time_entries__end_datetime") - F("time_entries__created_at")))
+        """Annotate tasks with the `duration` of their finished live entries plus their archived seconds"""
+        live_duration = Coalesce(
+            Sum(F("time_entries__end_datetime") - F("time_entries__created_at")),
+            Value(timedelta(0)), output_field=models.DurationField()
+        )
+        return self.tasks.annotate(duration=live_duration + F('archived_duration'))
 
     def has_any_running_task(self):
-        """Get all task time_entries of a project and check if any of them is running or not
-        
-        Also you can do that without looping through all tasks to be more efficient, but this is just a
-        demostration of using `prefetch_related()` function to solve n+1 problem
-        """
-        tasks = self.tasks.prefetch_related('time_entries').all()
-        return any((task.is_running() for task in tasks))
+        """Check if any task of the project has an open time entry, using a single EXISTS on the open entries index"""
+        return TaskTimeEntry.objects.filter(task__project=self).running().exists()
 
     def stop_all_tasks(self):
-        return TaskTimeEntry.objects.filter(task__project=self).update(end_datetime=timezone.now())
+        """Stop every running task of the project and return the list of `FinishedEntry` of stopped entries"""
+        return TaskTimeEntry.objects.filter(task__project=self).finish_running()
 
 
 class TaskQuerySet(LogicalDeletableQuerySet, models.QuerySet):
     def user_running_tasks(self, user):
-        return self.filter(project__created_by=user, time_entries__end_datetime__isnull=True)
+        return self.filter(project__created_by=user, time_entries__end_datetime__isnull=True).distinct()
 
     def user_finished_tasks(self, user):
-        return self.filter(project__created_by=user, time_entries__end_datetime__isnull=False)
+        return self.filter(project__created_by=user, time_entries__end_datetime__isnull=False).distinct()
+
+    def add_finished_entries(self, entries, task_ids=(), **changes):
+        """Add durations of `FinishedEntry` tuples to their tasks' `accumulated_seconds` in a single statement
+
+        Extra `changes` are applied by the same statement to the same tasks and to `task_ids`, and `updated_at` is set
+        to now.
+        """
+        seconds_per_task = defaultdict(int)
+        for entry in entries:
+            seconds_per_task[entry.task_id] += entry.seconds
+        return self.filter(pk__in={*seconds_per_task, *task_ids}).update(
+            accumulated_seconds=F('accumulated_seconds') + Case(
+                *(When(pk=task_id, then=Value(seconds)) for task_id, seconds in seconds_per_task.items()),
+                default=Value(0), output_field=models.BigIntegerField()
+            ),
+            **{'updated_at': timezone.now(), **changes}
+        )
+
+    def with_tracking_stats(self):
+        """Fetch the project and its owner in the same query, so a list of tasks can be serialized without
+        issuing per-row queries. Running state and duration are read from the task's own columns.
+        """
+        return self.select_related('project', 'project__created_by')
 
     
 class Task(Timestampable, NonSequentialIdentifierMixin, models.Model):
     title = models.CharField(max_length=255)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tasks')
+    # Materialized from `time_entries`, kept up to date by start/stop and `TaskTimeEntry.save()`. Use
+    # `manage.py rebuild_task_tracking` to rebuild them from the raw entries.
+    running_since = models.DateTimeField(null=True, blank=True)
+    accumulated_seconds = models.BigIntegerField(default=0)
+    # Total duration of the entries moved to `ArchivedTimeEntry`, still counted in `accumulated_seconds`
+    archived_duration = models.DurationField(default=timedelta(0))
     objects = TaskQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=('project', '-created_at', '-id'), name='task_project_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
     def get_total_spent_time(self, include_running_task=False):
-        default = timezone.now() if include_running_task else F("created_at")
-        delta = self.time_entries.annotate(
-            end=Case(
-                When(end_datetime__isnull=False, then=F("end_datetime")),
-                default=default
-            ),
-            duration=F("end") - F("created_at")
-        ).aggregate(s=Sum("duration"))["s"]
-        return delta.seconds if delta else 0
+        total = self.accumulated_seconds
+        if include_running_task and self.running_since:
+            total += seconds_between(self.running_since, timezone.now())
+        return total
 
     def is_running(self):
-        return self.time_entries.filter(end_datetime__isnull=True).exists()
+        return self.running_since is not None
+
+    def start(self, exclusive=False):
+        """Start a task by creating a new time entry and return True, or False if the task is already running
 
-    def start(self):
-        """Start a task by creating a new time entry
-        
         You cannot have a task with more than one time entries that have end_datetime=None. That means, your task
-        already is running.
+        already is running. This is enforced by a unique constraint, so starting is a single insert which is safe
+        against concurrent requests. If `exclusive` is True, the entry is also unique among open exclusive entries of
+        the project and `CuncurrentTaskException` is raised if another task of the project is running exclusively.
         """
-        if self.is_running():
-            return
-        TaskTimeEntry.objects.create(task=self)
+        try:
+            with transaction.atomic():
+                TaskTimeEntry.objects.create(task=self, exclusive_project_id=self.project_id if exclusive else None)
+        except IntegrityError:
+            if self.time_entries.running().exists():
+                self.refresh_from_db(fields=['running_since', 'accumulated_seconds'])
+                return False
+            if exclusive:
+                raise CuncurrentTaskException()
+            raise
+        return True
 
     def stop(self):
         """Stop a task by updating its time_entry's end_datetime attribute
         
         If there isn't any running task, we do nothing
         """
-        self.time_entries.filter(end_datetime__isnull=True).update(end_datetime=timezone.now())
+        finished_entries = self.time_entries.finish_running()
+        if finished_entries:
+            self.running_since = None
+            self.accumulated_seconds += sum(entry.seconds for entry in finished_entries)
+
+
+class FinishedEntry(namedtuple(
+        'FinishedEntry', ('entry_id', 'task_id', 'task_uuid', 'project_id', 'user_id', 'start', 'end', 'entry_uuid'),
+        defaults=(None, ))):
+    """A finished time entry, as sent by `time_entries_finished`. `entry_id` is None for entries inserted in bulk"""
+    @property
+    def span(self):
+        return (self.start, self.end)
+
+    @property
+    def seconds(self):
+        return span_seconds(self.span)
+
+
+StartedEntry = namedtuple(
+    'StartedEntry', ('task_id', 'task_uuid', 'project_id', 'user_id', 'start', 'entry_uuid'), defaults=(None, )
+)
+StartedEntry.__doc__ = """A started time entry, as sent by `time_entries_started`"""
+
+
+class TaskTimeEntryQuerySet(models.QuerySet):
+    def running(self):
+        return self.filter(end_datetime__isnull=True)
+
+    def delete_untracked(self):
+        """Delete entries like `delete()`, leaving the change log and data versions to the caller
+
+        `post_delete` is still sent for each entry, with this queryset as `origin`, for receivers to tell it apart.
+        """
+        self.untracked = True
+        return self.delete()
+
+    def finish_running(self, end_datetime=None):
+        """Finish all open entries of this queryset and add their durations to their tasks' counters
+
+        `end_datetime` defaults to now, it can also be an expression computing the end of each entry. Open entries
+        are locked and finished together, finished entries are never touched.
+        Return a list of `FinishedEntry` tuples describing the finished entries.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            finished = update_returning(
+                self.running(), ('id', 'task_id', 'created_at', 'end_datetime', 'uuid'),
+                end_datetime=end_datetime or now, updated_at=now
+            )
+            if not finished:
+                return []
+            tasks = {
+                task_id: task for task_id, *task in Task.objects.filter(
+                    pk__in={row[1] for row in finished}
+                ).values_list('pk', 'uuid', 'project_id', 'project__created_by_id')
+            }
+            entries = [
+                FinishedEntry(entry_id, task_id, *tasks[task_id], start, end, uuid)
+                for entry_id, task_id, start, end, uuid in finished
+            ]
+            Task.objects.add_finished_entries(entries, running_since=None)
+            time_entries_finished.send(sender=self.model, entries=entries)
+        return entries
 
 
 class TaskTimeEntry(Timestampable, NonSequentialIdentifierMixin, models.Model):
+    # The start of the entry. Not `auto_now_add`, so past entries can be inserted with their own start
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='time_entries')
     end_datetime = models.DateTimeField(null=True, blank=True)
+    # Set on entries started while `ProjectSetting.concurrent_tasks` is disabled, to allow a single open one per project
+    exclusive_project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='+'
+    )
+    objects = TaskTimeEntryQuerySet.as_manager()
 
     class Meta:
         db_table = 'task_time_entry'
         ordering = ('-created_at', )
+        indexes = [
+            models.Index(fields=('task', '-created_at', '-id'), name='time_entry_task_created_idx'),
+        ]
+        constraints = [
+            # Their partial unique indexes contain open entries only, so "what is running?" lookups stay small
+            # however long the history is
+            models.UniqueConstraint(
+                fields=('task', ), condition=Q(end_datetime__isnull=True), name='time_entry_one_open_per_task'
+            ),
+            models.UniqueConstraint(
+                fields=('exclusive_project', ), condition=Q(end_datetime__isnull=True),
+                name='time_entry_one_exclusive_open_per_project'
+            ),
+        ]
+
+    # The `(start, end)` span of this entry as it is stored in database, used to keep the task's columns in sync
+    _tracked_span = None
 
     def __str__(self):
         return f"{self.task.title}: {self.duration_in_sec} sec(s)"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tracked_span = instance._current_span()
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._sync_task_tracking(self._current_span())
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._sync_task_tracking(None)
+        return result
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._tracked_span = self._current_span()
+
     @property
     def start_datetime(self):
         return self.created_at
@@ -117,7 +297,7 @@ class TaskTimeEntry(Timestampable, NonSequentialIdentifierMixin, models.Model):
     @property
     def duration_in_sec(self):
         end_datetime = self.end_datetime or timezone.now()
-        return (end_datetime - self.start_datetime).seconds
+        return seconds_between(self.start_datetime, end_datetime)
 
     def is_finished(self):
         return not self.end_datetime == None
@@ -125,4 +305,161 @@ class TaskTimeEntry(Timestampable, NonSequentialIdentifierMixin, models.Model):
     def finish(self, commit=True):
         self.end_datetime = timezone.now()
         if commit:
-            self.save()
\ No newline at end of file
+            self.save()
+
+    def _current_span(self):
+        return (self.created_at, self.end_datetime)
+
+    def _sync_task_tracking(self, new_span):
+        """Apply the difference between the last saved span of this entry and `new_span` to the task's columns
+
+        A span is a `(start, end)` tuple, or None when the entry doesn't exist in database.
+        """
+        old_span = self._tracked_span
+        changes = {}
+        delta = span_seconds(new_span) - span_seconds(old_span)
+        if delta:
+            changes['accumulated_seconds'] = F('accumulated_seconds') + delta
+        if new_span and new_span[1] is None:
+            if old_span != new_span:
+                changes['running_since'] = new_span[0]
+        elif old_span and old_span[1] is None:
+            changes['running_since'] = None
+        if changes:
+            # Durations are served from the task, so its `updated_at` must change with them for conditional requests
+            changes['updated_at'] = timezone.now()
+            Task.objects.filter(pk=self.task_id).update(**changes)
+            if TaskTimeEntry.task.is_cached(self):
+                self.task.accumulated_seconds += delta
+                self.task.running_since = changes.get('running_since', self.task.running_since)
+        if new_span and new_span[1] is not None and (old_span is None or old_span[1] is None):
+            self._send_finished_signal(new_span)
+        elif old_span is None and new_span and new_span[1] is None:
+            self._send_started_signal(new_span[0])
+        self._tracked_span = new_span
+
+    def _send_finished_signal(self, span):
+        if not time_entries_finished.has_listeners(TaskTimeEntry):
+            return
+        entry = FinishedEntry(self.pk, self.task_id, *self._task_identifiers(), *span, self.uuid)
+        time_entries_finished.send(sender=TaskTimeEntry, entries=[entry], instance=self)
+
+    def _send_started_signal(self, start):
+        if not time_entries_started.has_listeners(TaskTimeEntry):
+            return
+        entry = StartedEntry(self.task_id, *self._task_identifiers(), start, self.uuid)
+        time_entries_started.send(sender=TaskTimeEntry, entries=[entry], instance=self)
+
+    def _task_identifiers(self):
+        """Return the task's uuid, project id and owner id, from the fetched task and project where possible"""
+        if TaskTimeEntry.task.is_cached(self) and Task.project.is_cached(self.task):
+            return self.task.uuid, self.task.project_id, self.task.project.created_by_id
+        return Task.objects.filter(pk=self.task_id).values_list('uuid', 'project_id', 'project__created_by_id').get()
+
+
+class ArchivedTimeEntry(models.Model):
+    """A finished time entry moved out of `task_time_entry` by `ArchiveTimeEntriesService`
+
+    Only what is needed to report and export it is kept. Its duration stays counted in its task's
+    `accumulated_seconds`, and in `archived_duration`.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='archived_time_entries')
+    uuid = models.UUIDField()
+    start_datetime = models.DateTimeField()
+    end_datetime = models.DateTimeField()
+
+    class Meta:
+        db_table = 'archived_time_entry'
+        indexes = [
+            models.Index(fields=('task', 'start_datetime'), name='archived_entry_task_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {seconds_between(self.start_datetime, self.end_datetime)} sec(s)"
+
+
+class TimerAutoStop(models.Model):
+    """Audit of a running time entry stopped by `StopStaleTimersService`, at its start plus `limit`
+
+    `time_entry` is unset when the entry is archived or deleted, `time_entry_uuid` keeps identifying it.
+    """
+    time_entry = models.ForeignKey(TaskTimeEntry, on_delete=models.SET_NULL, null=True, related_name='+')
+    time_entry_uuid = models.UUIDField()
+    limit = models.DurationField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'timer_auto_stop'
+
+    def __str__(self):
+        return f"{self.time_entry_uuid} stopped after {self.limit}"
+
+
+class ChangeLogQuerySet(models.QuerySet):
+    def record(self, changes):
+        """Append `(user_id, kind, object_uuid)` changes to the change log in a single insert"""
+        return self.bulk_create([
+            self.model(user_id=user_id, kind=kind, object_uuid=object_uuid) for user_id, kind, object_uuid in changes
+        ])
+
+    def user_changes(self, user, since=0, until=None):
+        changes = self.filter(user=user, pk__gt=since).order_by('pk')
+        return changes if until is None else changes.filter(pk__lte=until)
+
+    def committed_horizon(self, settle_after):
+        """Return the id up to which all changes are committed, i.e. no transaction in flight can still add one
+
+        Ids are taken when changes are inserted, not when their transactions commit, so an id missing from the log is
+        a change still being committed, unless it is older than `settle_after` (a timedelta) and taken as rolled back.
+        The horizon stops before the first missing id inserted after the last change older than `settle_after`.
+        """
+        horizon = self.filter(created_at__lt=timezone.now() - settle_after).order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        for pk in self.filter(pk__gt=horizon).order_by('pk').values_list('pk', flat=True):
+            if pk != horizon + 1:
+                break
+            horizon = pk
+        return horizon
+
+
+class ChangeLogEntry(models.Model):
+    """A project, task or time entry of a user created, updated or deleted, appended by the project's receivers
+
+    Ids only grow, so the id of the last change a client has seen is its sync token. Tokens never go past
+    `ChangeLogQuerySet.committed_horizon()`, as a lower id may still be committed after a higher one. An entry only
+    tells the object has changed, its current state (or its absence, for deleted objects) is read from its own table.
+    """
+    PROJECT = 'project'
+    TASK = 'task'
+    TIME_ENTRY = 'time_entry'
+    KIND_CHOICES = (
+        (PROJECT, 'Project'),
+        (TASK, 'Task'),
+        (TIME_ENTRY, 'Time entry'),
+    )
+    user = models.ForeignKey('user.User', on_delete=models.CASCADE, related_name='+', db_index=False)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_uuid = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    objects = ChangeLogQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'change_log'
+        indexes = [
+            models.Index(fields=('user', 'id'), name='change_log_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_uuid}"
+
+
+def seconds_between(start, end):
+    return int((end - start).total_seconds())
+
+
+def span_seconds(span):
+    """Return the tracked seconds of a finished `(start, end)` span, zero for missing or running ones"""
+    if not span or span[1] is None:
+        return 0
+    return seconds_between(*span)
@@ -0,0 +1,42 @@
+import codecs
+import csv
+import json
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+
+class RowStreamParser(BaseParser):
+    """Base parser for row based formats
+
+    Parsing returns a generator of `(line_number, row)` tuples, so the request body is consumed lazily. `row` is a
+    dict, or None when the line is malformed.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        return self.iter_rows(codecs.getreader(encoding)(stream))
+
+    def iter_rows(self, lines):
+        raise NotImplementedError('`iter_rows()` method must be implemented in your derived class')
+
+
+class CSVParser(RowStreamParser):
+    media_type = 'text/csv'
+
+    def iter_rows(self, lines):
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+
+
+class NDJSONParser(RowStreamParser):
+    media_type = 'application/x-ndjson'
+
+    def iter_rows(self, lines):
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
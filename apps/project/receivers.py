@@ -0,0 +1,82 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.core.cache import bump_data_version
+from .events import publish_timer_event
+from .models import ChangeLogEntry, Project, Task, TaskTimeEntry
+from .signals import time_entries_finished, time_entries_started
+
+
+def _project_owner_id(project_id, task=None):
+    # Use the already fetched project where possible, task requests fetch it along with the task
+    if task is not None and Task.project.is_cached(task):
+        return task.project.created_by_id
+    return Project.objects.filter(pk=project_id).values_list('created_by_id', flat=True).first()
+
+
+def _task_owner_id_and_uuid(entry):
+    if TaskTimeEntry.task.is_cached(entry):
+        return _project_owner_id(entry.task.project_id, entry.task), entry.task.uuid
+    return Task.objects.filter(pk=entry.task_id).values_list('project__created_by_id', 'uuid').first() or (None, None)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def track_project_change(sender, instance, **kwargs):
+    bump_data_version(instance.created_by_id)
+    ChangeLogEntry.objects.record([(instance.created_by_id, ChangeLogEntry.PROJECT, instance.uuid)])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def track_task_change(sender, instance, **kwargs):
+    owner_id = _project_owner_id(instance.project_id, instance)
+    bump_data_version(owner_id)
+    ChangeLogEntry.objects.record([(owner_id, ChangeLogEntry.TASK, instance.uuid)])
+
+
+@receiver(post_save, sender=TaskTimeEntry)
+@receiver(post_delete, sender=TaskTimeEntry)
+def track_time_entry_change(sender, instance, origin=None, **kwargs):
+    if getattr(origin, 'untracked', False):
+        # Deleted by `TaskTimeEntryQuerySet.delete_untracked()`, whose caller logs them in bulk
+        return
+    owner_id, task_uuid = _task_owner_id_and_uuid(instance)
+    if owner_id is None:
+        return
+    bump_data_version(owner_id)
+    # The task's tracking columns follow its entries
+    ChangeLogEntry.objects.record([
+        (owner_id, ChangeLogEntry.TIME_ENTRY, instance.uuid), (owner_id, ChangeLogEntry.TASK, task_uuid)
+    ])
+
+
+@receiver(time_entries_started)
+@receiver(time_entries_finished)
+def track_entries_change(sender, entries, instance=None, **kwargs):
+    if instance is not None:
+        # Saved entries are tracked by `track_time_entry_change()`
+        return
+    bump_data_version(*{entry.user_id for entry in entries})
+    changes = {(entry.user_id, ChangeLogEntry.TASK, entry.task_uuid) for entry in entries}
+    changes.update(
+        (entry.user_id, ChangeLogEntry.TIME_ENTRY, entry.entry_uuid) for entry in entries if entry.entry_uuid
+    )
+    ChangeLogEntry.objects.record(changes)
+
+
+@receiver(time_entries_started)
+def publish_started_entries(sender, entries, **kwargs):
+    for entry in entries:
+        publish_timer_event(entry.user_id, 'started', task=str(entry.task_uuid), start=entry.start.isoformat())
+
+
+@receiver(time_entries_finished)
+def publish_finished_entries(sender, entries, **kwargs):
+    for entry in entries:
+        if entry.entry_id is None:
+            # Inserted in bulk with an end, these entries were never running
+            continue
+        publish_timer_event(
+            entry.user_id, 'stopped', task=str(entry.task_uuid), start=entry.start.isoformat(),
+            end=entry.end.isoformat(), duration=entry.seconds
+        )
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class RowStreamRenderer(BaseRenderer):
+    """Base renderer for row based formats which can also be streamed row by row
+
+    `render()` is used for regular (e.g. error) responses, `stream()` to feed a `StreamingHttpResponse`.
+    """
+    charset = 'utf-8'
+    rows_per_chunk = 500
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        columns = list(rows[0].keys()) if rows and isinstance(rows[0], dict) else []
+        return ''.join(self.stream(columns, ([row.get(column) for column in columns] for row in rows))).encode()
+
+    def stream(self, columns, rows):
+        """Yield the formatted output of `rows` (sequences of values, ordered as `columns`) in chunks"""
+        chunk = []
+        for row in rows:
+            chunk.append(self.format_row(columns, row))
+            if len(chunk) == self.rows_per_chunk:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+
+    def format_row(self, columns, row):
+        raise NotImplementedError('`format_row()` method must be implemented in your derived class')
+
+
+class CSVRenderer(RowStreamRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, columns, rows):
+        yield self.format_row(columns, columns)
+        yield from super().stream(columns, rows)
+
+    def format_row(self, columns, row):
+        line = io.StringIO()
+        csv.writer(line).writerow(row)
+        return line.getvalue()
+
+
+class NDJSONRenderer(RowStreamRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def format_row(self, columns, row):
+        return json.dumps(dict(zip(columns, row)), cls=JSONEncoder) + '\n'
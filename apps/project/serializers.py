@@ -1,17 +1,31 @@
 from rest_framework import serializers
-from .models import Project, Task
+from apps.core.instrumentation import InstrumentedSerializerMixin
+from .models import Project, Task, TaskTimeEntry
 
 
-class ProjectSeriailzer(serializers.ModelSerializer):
+class ProjectSeriailzer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     owner = serializers.CharField(source='created_by', read_only=True)
 
     class Meta:
         model = Project
-        fields = ('uuid', 'title', 'slug', 'is_deleted', 'created_at', 'updated_at', 'owner')
+        fields = ('uuid', 'title', 'slug', 'auto_stop_after', 'is_deleted', 'created_at', 'updated_at', 'owner')
         read_only_fields = ('slug', )
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class ProjectStatsSerializer(ProjectSeriailzer):
+    """Serialize a project annotated by `ProjectQuerySet.with_stats()`"""
+    task_count = serializers.IntegerField(read_only=True)
+    running_task_count = serializers.IntegerField(read_only=True)
+    total_seconds = serializers.IntegerField(read_only=True)
+    last_activity_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(ProjectSeriailzer.Meta):
+        fields = ProjectSeriailzer.Meta.fields + (
+            'task_count', 'running_task_count', 'total_seconds', 'last_activity_at'
+        )
+
+
+class TaskSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     project = ProjectSeriailzer(many=False, read_only=True)
     is_running = serializers.SerializerMethodField()
     duration = serializers.SerializerMethodField()
@@ -25,4 +39,97 @@ class TaskSerializer(serializers.ModelSerializer):
 
     def get_duration(self, obj):
         return obj.get_total_spent_time()
-    
\ No newline at end of file
+
+
+class TaskTimeEntrySerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    start = serializers.DateTimeField(source='start_datetime', read_only=True)
+    end = serializers.DateTimeField(source='end_datetime', read_only=True)
+    duration = serializers.IntegerField(source='duration_in_sec', read_only=True)
+
+    class Meta:
+        model = TaskTimeEntry
+        fields = ('uuid', 'start', 'end', 'duration')
+
+
+class StoppedTaskSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    """Serialize a `FinishedEntry` as the stopped task and the duration of its stopped entry"""
+    uuid = serializers.UUIDField(source='task_uuid')
+    duration = serializers.IntegerField(source='seconds')
+
+
+class TimeEntryExportQuerySerializer(serializers.Serializer):
+    """Validate the optional `from` and `to` query parameters of time entry export"""
+    def get_fields(self):
+        # `from` is a python keyword, so the fields cannot be declared as class attributes
+        return {
+            'from': serializers.DateTimeField(required=False),
+            'to': serializers.DateTimeField(required=False),
+        }
+
+
+class TimeEntryImportQuerySerializer(serializers.Serializer):
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+    create_missing = serializers.BooleanField(default=True)
+
+
+class ImportRejectionSerializer(serializers.Serializer):
+    line = serializers.IntegerField()
+    error = serializers.CharField()
+
+
+class ImportResultSerializer(serializers.Serializer):
+    imported = serializers.IntegerField()
+    rejected = ImportRejectionSerializer(many=True)
+    elapsed = serializers.FloatField()
+    rows_per_second = serializers.FloatField()
+
+
+class TaskOperationSerializer(serializers.Serializer):
+    task = serializers.UUIDField()
+    action = serializers.ChoiceField(choices=('start', 'stop'))
+    timestamp = serializers.DateTimeField(required=False)
+
+
+class TaskBatchSerializer(serializers.Serializer):
+    operations = serializers.ListField(child=TaskOperationSerializer(), min_length=1, max_length=500)
+
+
+class TaskOperationResultSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    """Serialize a `TaskOperationResult`. `duration` is the stopped entry's duration (seconds) of stop operations"""
+    task = serializers.UUIDField()
+    action = serializers.CharField()
+    status = serializers.CharField()
+    error = serializers.CharField(allow_null=True)
+    duration = serializers.IntegerField(allow_null=True)
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=500)
+
+
+class SyncEditsSerializer(SyncQuerySerializer):
+    operations = serializers.ListField(child=TaskOperationSerializer(), max_length=500, default=list)
+
+
+class SyncTimeEntrySerializer(TaskTimeEntrySerializer):
+    task = serializers.UUIDField(source='task.uuid', read_only=True)
+
+    class Meta(TaskTimeEntrySerializer.Meta):
+        fields = ('uuid', 'task', 'start', 'end', 'duration')
+
+
+class SyncDeletedSerializer(serializers.Serializer):
+    projects = serializers.ListField(child=serializers.UUIDField(), source='project')
+    tasks = serializers.ListField(child=serializers.UUIDField(), source='task')
+    time_entries = serializers.ListField(child=serializers.UUIDField(), source='time_entry')
+
+
+class SyncResultSerializer(serializers.Serializer):
+    """Serialize a `SyncResult`. The token is a string, so clients don't depend on it being a number"""
+    token = serializers.CharField()
+    has_more = serializers.BooleanField()
+    projects = ProjectSeriailzer(many=True)
+    tasks = TaskSerializer(many=True)
+    time_entries = SyncTimeEntrySerializer(many=True)
+    deleted = SyncDeletedSerializer()
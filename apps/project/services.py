@@ -1,28 +1,687 @@
+import bisect
+import heapq
+import time
+from collections import defaultdict, namedtuple
+from itertools import chain
+from datetime import datetime, timedelta, timezone as dt_timezone
+from operator import itemgetter
+from uuid import uuid4
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Case, DateTimeField, DurationField, ExpressionWrapper, F, Max, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+from rest_framework.authtoken.models import Token
 from apps.core.base import AbstractService
-from .exceptions import NoRunningTaskFoundException, CuncurrentTaskException
-from .models import Project, ProjectSetting
+from .exceptions import NoRunningTaskFoundException, InvalidImportRow
+from .models import (
+    ArchivedTimeEntry, ChangeLogEntry, Project, ProjectSetting, Task, TaskTimeEntry, TimerAutoStop, FinishedEntry,
+    StartedEntry, seconds_between, span_seconds
+)
+from .signals import time_entries_finished, time_entries_started
+from apps.core.cache import bump_data_version
+from apps.core.db import update_returning
+from apps.user.models import User
 
 
 class StopAllTasksService(AbstractService):
-    """Get a project as input and stop all task_time_entries related to that project
+    """Get a project as input and stop all running task_time_entries related to that project
+        Return the list of `FinishedEntry` of stopped entries
         Raise NoRunningTaskFoundException if all tasks are stopped
     """
     project = None
 
     def execute(self):
         proj: Project = self.project
-        if not proj.has_any_running_task():
-            raise NoRunningTaskFoundException()
         stopped_tasks = proj.stop_all_tasks()
+        if not stopped_tasks:
+            raise NoRunningTaskFoundException()
+        return stopped_tasks
+
+
+class StopAllUserTasksService(AbstractService):
+    """Stop all running tasks of all projects of `user`, like `StopAllTasksService`"""
+    user = None
+
+    def execute(self):
+        stopped_tasks = TaskTimeEntry.objects.filter(task__project__created_by=self.user).finish_running()
+        if not stopped_tasks:
+            raise NoRunningTaskFoundException()
         return stopped_tasks
 
 
+class StopStaleTimersService(AbstractService):
+    """Stop running time entries older than the `auto_stop_after` limit of their project, or of `ProjectSetting`
+
+    Stale entries are stopped at their start plus the limit, so forgotten timers don't count the idle time. They are
+    processed oldest first, `batch_size` at a time, each batch in its own transaction along with a `TimerAutoStop`
+    per stopped entry. Return the number of stopped entries.
+    """
+    batch_size = 500
+
+    def execute(self):
+        stopped = 0
+        while True:
+            count = self._stop_batch()
+            stopped += count
+            if count < self.batch_size:
+                return stopped
+
+    def _stale_entries(self):
+        default_limit = ProjectSetting.load().auto_stop_after
+        return TaskTimeEntry.objects.running().annotate(
+            limit=Coalesce('task__project__auto_stop_after', Value(default_limit, output_field=DurationField()))
+        ).annotate(
+            deadline=ExpressionWrapper(F('created_at') + F('limit'), output_field=DateTimeField())
+        ).filter(deadline__lte=timezone.now())
+
+    def _stop_batch(self):
+        stale = list(
+            self._stale_entries().order_by('created_at').values_list('pk', 'created_at', 'limit')[:self.batch_size]
+        )
+        if not stale:
+            return 0
+        limits = {entry_id: limit for entry_id, _, limit in stale}
+        with transaction.atomic():
+            finished = TaskTimeEntry.objects.filter(pk__in=limits).finish_running(Case(
+                *(When(pk=entry_id, then=Value(start + limit)) for entry_id, start, limit in stale),
+                output_field=DateTimeField()
+            ))
+            TimerAutoStop.objects.bulk_create([
+                TimerAutoStop(
+                    time_entry_id=entry.entry_id, time_entry_uuid=entry.entry_uuid, limit=limits[entry.entry_id]
+                )
+                for entry in finished
+            ])
+        return len(finished)
+
+
 class StartTaskService(AbstractService):
+    """Start `task` and return False if it was already running
+
+    Unless `ProjectSetting.concurrent_tasks` is enabled, raise `CuncurrentTaskException` if another task of the same
+    project is running.
+    """
     task = None
 
     def execute(self):
-        task = self.task
         setting = ProjectSetting.load()
-        if setting.concurrent_tasks and task.project.has_any_running_task():
-            raise CuncurrentTaskException()
-        task.start()
+        return self.task.start(exclusive=not setting.concurrent_tasks)
+
+
+TaskOperationResult = namedtuple('TaskOperationResult', ('task', 'action', 'status', 'error', 'duration'))
+
+
+class BatchTaskOperationsService(AbstractService):
+    """Apply `operations` to tasks of `user` in a single transaction and return a `TaskOperationResult` for each
+
+    Operations are dicts with `task` (UUID), `action` (`start` or `stop`) and an optional `timestamp` (now by default),
+    applied in order, so a task can be started and stopped by the same batch. An operation which cannot be applied is
+    rejected with an error and doesn't affect the others. Starting a running task does nothing, like
+    `StartTaskService`, and unless `ProjectSetting.concurrent_tasks` is enabled, a task cannot be started while
+    another task of its project is running exclusively, like `Task.start()`.
+
+    Ownership, running tasks and previous entries are read with one query each. All stops of running entries are
+    applied by one UPDATE, all new entries are inserted at once and task columns are updated by one UPDATE.
+    """
+    user = None
+    operations = None
+
+    def execute(self):
+        self._now = timezone.now()
+        self._exclusive = not ProjectSetting.load().concurrent_tasks
+        with transaction.atomic():
+            self._load_state()
+            results = [self._apply(operation) for operation in self.operations]
+            self._write()
+        return results
+
+    def _load_state(self):
+        self._tasks = {
+            task.uuid: task for task in Task.objects.filter(
+                uuid__in={operation['task'] for operation in self.operations}, project__created_by=self.user
+            ).only('uuid', 'project_id', 'running_since')
+        }
+        self._running = {task.pk: task.running_since for task in self._tasks.values() if task.running_since}
+        # Tasks running exclusively by project, like the `time_entry_one_exclusive_open_per_project` constraint
+        self._exclusive_running = dict(TaskTimeEntry.objects.filter(
+            exclusive_project_id__in={task.project_id for task in self._tasks.values()}
+        ).running().values_list('exclusive_project_id', 'task_id'))
+        self._last_end = {}
+        for entries in (ArchivedTimeEntry.objects, TaskTimeEntry.objects):
+            for task_id, last_end in entries.filter(task__in=self._tasks.values()).values('task_id').annotate(
+                    last_end=Max('end_datetime')
+            ).values_list('task_id', 'last_end'):
+                if last_end is not None:
+                    self._last_end[task_id] = max(last_end, self._last_end.get(task_id, last_end))
+        self._stops = {}
+        self._open_entries = {}
+        self._closed_entries = []
+        self._finished = []
+
+    def _apply(self, operation):
+        task = self._tasks.get(operation['task'])
+        timestamp = operation.get('timestamp') or self._now
+        if task is None:
+            error = 'Task not found'
+        elif timestamp > self._now:
+            error = 'Timestamp is in the future'
+        elif operation['action'] == 'start':
+            return self._start(task, timestamp)
+        else:
+            return self._stop(task, timestamp)
+        return TaskOperationResult(operation['task'], operation['action'], 'rejected', error, None)
+
+    def _start(self, task, timestamp):
+        if task.pk in self._running:
+            return TaskOperationResult(task.uuid, 'start', 'already_running', None, None)
+        if self._last_end.get(task.pk) and timestamp < self._last_end[task.pk]:
+            return TaskOperationResult(task.uuid, 'start', 'rejected', 'Overlaps a previous time entry', None)
+        if self._exclusive and task.project_id in self._exclusive_running:
+            return TaskOperationResult(
+                task.uuid, 'start', 'rejected', 'Another task of the project is running', None
+            )
+        self._open_entries[task.pk] = TaskTimeEntry(
+            task=task, created_at=timestamp, exclusive_project_id=task.project_id if self._exclusive else None
+        )
+        self._running[task.pk] = timestamp
+        if self._exclusive:
+            self._exclusive_running[task.project_id] = task.pk
+        return TaskOperationResult(task.uuid, 'start', 'started', None, None)
+
+    def _stop(self, task, timestamp):
+        start = self._running.get(task.pk)
+        if start is None:
+            return TaskOperationResult(task.uuid, 'stop', 'rejected', 'Task is not running', None)
+        if timestamp < start:
+            return TaskOperationResult(task.uuid, 'stop', 'rejected', 'Timestamp is before the start', None)
+        entry = self._open_entries.pop(task.pk, None)
+        if entry is None:
+            self._stops[task.pk] = timestamp
+        else:
+            entry.end_datetime = timestamp
+            self._closed_entries.append(entry)
+            self._finished.append(self._finished_entry(None, task, start, timestamp, entry.uuid))
+        del self._running[task.pk]
+        if self._exclusive_running.get(task.project_id) == task.pk:
+            del self._exclusive_running[task.project_id]
+        self._last_end[task.pk] = timestamp
+        return TaskOperationResult(task.uuid, 'stop', 'stopped', None, seconds_between(start, timestamp))
+
+    def _write(self):
+        tasks_by_id = {task.pk: task for task in self._tasks.values()}
+        if self._stops:
+            stopped = update_returning(
+                TaskTimeEntry.objects.filter(task_id__in=self._stops).running(),
+                ('id', 'task_id', 'created_at', 'uuid'),
+                end_datetime=Case(
+                    *(When(task_id=task_id, then=Value(end)) for task_id, end in self._stops.items()),
+                    output_field=DateTimeField()
+                ),
+                updated_at=self._now
+            )
+            self._finished += [
+                self._finished_entry(entry_id, tasks_by_id[task_id], start, self._stops[task_id], uuid)
+                for entry_id, task_id, start, uuid in stopped
+            ]
+        started = list(self._open_entries.values())
+        TaskTimeEntry.objects.bulk_create(self._closed_entries + started)
+        touched = set(self._stops) | {entry.task_id for entry in self._closed_entries + started}
+        if not touched:
+            return
+        Task.objects.add_finished_entries(
+            self._finished, task_ids=touched,
+            running_since=Case(
+                *(When(pk=task_id, then=Value(self._running.get(task_id))) for task_id in touched),
+                output_field=DateTimeField()
+            ),
+            updated_at=self._now
+        )
+        if started:
+            time_entries_started.send(sender=TaskTimeEntry, entries=[
+                StartedEntry(
+                    entry.task_id, entry.task.uuid, entry.task.project_id, self.user.pk, entry.created_at, entry.uuid
+                )
+                for entry in started
+            ])
+        if self._finished:
+            time_entries_finished.send(sender=TaskTimeEntry, entries=self._finished)
+
+    def _finished_entry(self, entry_id, task, start, end, entry_uuid):
+        return FinishedEntry(entry_id, task.pk, task.uuid, task.project_id, self.user.pk, start, end, entry_uuid)
+
+
+SyncResult = namedtuple('SyncResult', ('token', 'has_more', 'projects', 'tasks', 'time_entries', 'deleted'))
+
+
+class SyncChangesService(AbstractService):
+    """Return the projects, tasks and time entries of `user` changed after the change log id `since` as a `SyncResult`
+
+    At most `limit` changes are read, `has_more` tells if the client should sync again from the returned `token`.
+    Only changes up to the committed horizon are read (see `ChangeLogQuerySet.committed_horizon()`), and the token is
+    that horizon once everything up to it is returned, so a change committed late is never skipped by a client.
+    Changed objects are read in one query per kind, and changed objects which don't exist anymore are returned by kind
+    in `deleted`. Soft-deleted projects are returned like other projects, with `is_deleted` set.
+    """
+    user = None
+    since = 0
+    limit = 500
+
+    def execute(self):
+        horizon = ChangeLogEntry.objects.committed_horizon(timedelta(seconds=settings.SYNC_SETTLE_SECONDS))
+        changes = list(
+            ChangeLogEntry.objects.user_changes(self.user, self.since, horizon).values_list('pk', 'kind', 'object_uuid')
+            [:self.limit + 1]
+        )
+        has_more = len(changes) > self.limit
+        changes = changes[:self.limit]
+        changed = {kind: set() for kind, _ in ChangeLogEntry.KIND_CHOICES}
+        for _, kind, object_uuid in changes:
+            changed[kind].add(object_uuid)
+        projects = list(Project.objects.user_projects(self.user).filter(
+            uuid__in=changed[ChangeLogEntry.PROJECT]
+        ).select_related('created_by'))
+        tasks = list(Task.objects.filter(
+            project__created_by=self.user, uuid__in=changed[ChangeLogEntry.TASK]
+        ).with_tracking_stats())
+        time_entries = list(TaskTimeEntry.objects.filter(
+            task__project__created_by=self.user, uuid__in=changed[ChangeLogEntry.TIME_ENTRY]
+        ).select_related('task'))
+        deleted = {
+            ChangeLogEntry.PROJECT: changed[ChangeLogEntry.PROJECT] - {project.uuid for project in projects},
+            ChangeLogEntry.TASK: changed[ChangeLogEntry.TASK] - {task.uuid for task in tasks},
+            ChangeLogEntry.TIME_ENTRY: changed[ChangeLogEntry.TIME_ENTRY] - {entry.uuid for entry in time_entries},
+        }
+        if has_more:
+            token = changes[-1][0]
+        else:
+            token = max(self.since, horizon)
+        return SyncResult(token, has_more, projects, tasks, time_entries, deleted)
+
+
+class RebuildTaskTrackingService(AbstractService):
+    """Recompute `Task.running_since`, `Task.accumulated_seconds` and `Task.archived_duration` from the raw and
+    archived time entries
+
+    Tasks are processed in batches of `batch_size`. Return the number of tasks whose columns were out of sync. If
+    `commit` is False, out of sync tasks are only counted and nothing is written.
+    """
+    batch_size = 1000
+    commit = True
+
+    def execute(self):
+        mismatches = 0
+        last_pk = 0
+        while True:
+            tasks = list(
+                Task.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                    'running_since', 'accumulated_seconds', 'archived_duration'
+                )[:self.batch_size]
+            )
+            if not tasks:
+                return mismatches
+            last_pk = tasks[-1].pk
+            outdated_tasks = self._outdated_tasks(tasks)
+            mismatches += len(outdated_tasks)
+            if self.commit and outdated_tasks:
+                Task.objects.bulk_update(
+                    outdated_tasks, ['running_since', 'accumulated_seconds', 'archived_duration', 'updated_at']
+                )
+                owners = Task.objects.filter(pk__in=[task.pk for task in outdated_tasks]).values_list(
+                    'project__created_by_id', 'uuid'
+                )
+                bump_data_version(*{owner_id for owner_id, _ in owners})
+                ChangeLogEntry.objects.record(
+                    (owner_id, ChangeLogEntry.TASK, task_uuid) for owner_id, task_uuid in owners
+                )
+
+    def _outdated_tasks(self, tasks):
+        expected = {task.pk: [None, 0, timedelta(0)] for task in tasks}
+        entries = TaskTimeEntry.objects.filter(task__in=tasks).values_list('task_id', 'created_at', 'end_datetime')
+        for task_id, start, end in entries.iterator():
+            if end is None:
+                expected[task_id][0] = max(filter(None, (expected[task_id][0], start)))
+            else:
+                expected[task_id][1] += span_seconds((start, end))
+        archived_entries = ArchivedTimeEntry.objects.filter(task__in=tasks).values_list(
+            'task_id', 'start_datetime', 'end_datetime'
+        )
+        for task_id, start, end in archived_entries.iterator():
+            expected[task_id][1] += span_seconds((start, end))
+            expected[task_id][2] += end - start
+        outdated_tasks = []
+        now = timezone.now()
+        for task in tasks:
+            columns = tuple(expected[task.pk])
+            if (task.running_since, task.accumulated_seconds, task.archived_duration) != columns:
+                task.running_since, task.accumulated_seconds, task.archived_duration = columns
+                task.updated_at = now
+                outdated_tasks.append(task)
+        return outdated_tasks
+
+
+class ArchiveTimeEntriesService(AbstractService):
+    """Move time entries which ended before `before` to `ArchivedTimeEntry`, `batch_size` at a time
+
+    Each batch is copied, added to its tasks' `archived_duration` and deleted from `task_time_entry` in its own
+    transaction. Durations of archived entries stay counted in their tasks and reports. Deletions are logged in the
+    change log by a single insert per batch, so synced clients drop the entries, and `TimerAutoStop` audits keep the
+    uuids of their entries. Return the number of archived entries.
+    """
+    before = None
+    batch_size = 5000
+
+    def execute(self):
+        entries = TaskTimeEntry.objects.filter(end_datetime__lt=self.before).order_by('pk').values_list(
+            'pk', 'task_id', 'uuid', 'created_at', 'end_datetime', 'task__uuid', 'task__project__created_by_id'
+        )
+        archived = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                batch = list(entries.filter(pk__gt=last_pk)[:self.batch_size])
+                if not batch:
+                    return archived
+                self._archive(batch)
+            archived += len(batch)
+            last_pk = batch[-1][0]
+
+    def _archive(self, batch):
+        ArchivedTimeEntry.objects.bulk_create([
+            ArchivedTimeEntry(task_id=task_id, uuid=uuid, start_datetime=start, end_datetime=end)
+            for _, task_id, uuid, start, end, *_ in batch
+        ])
+        durations = defaultdict(timedelta)
+        for _, task_id, _, start, end, *_ in batch:
+            durations[task_id] += end - start
+        Task.objects.filter(pk__in=durations).update(archived_duration=F('archived_duration') + Case(
+            *(When(pk=task_id, then=Value(duration)) for task_id, duration in durations.items()),
+            output_field=DurationField()
+        ))
+        # Not `TaskTimeEntry.delete()`, which would take the durations out of the tasks' counters
+        TaskTimeEntry.objects.filter(pk__in=[entry_id for entry_id, *_ in batch]).delete_untracked()
+        changes = set()
+        for _, _, uuid, _, _, task_uuid, owner_id in batch:
+            changes.add((owner_id, ChangeLogEntry.TIME_ENTRY, uuid))
+            changes.add((owner_id, ChangeLogEntry.TASK, task_uuid))
+        ChangeLogEntry.objects.record(changes)
+        bump_data_version(*{owner_id for *_, owner_id in batch})
+
+
+class ExportTimeEntriesService(AbstractService):
+    """Return an iterator over the time entries of `project` started between `date_from` and `date_to`
+
+    Rows are plain tuples ordered as `COLUMNS`. Entries are read from database `chunk_size` rows at a time without
+    instantiating models, and durations are computed in SQL, so memory usage doesn't depend on the number of rows.
+    Archived entries are merged with live ones by their start.
+    """
+    COLUMNS = ('uuid', 'task', 'task_title', 'start', 'end', 'duration')
+    project = None
+    date_from = None
+    date_to = None
+    chunk_size = 2000
+
+    def execute(self):
+        rows = heapq.merge(
+            self._rows(ArchivedTimeEntry.objects.all(), 'start_datetime'),
+            self._rows(TaskTimeEntry.objects.all(), 'created_at'),
+            key=itemgetter(3)
+        )
+        return (self._format_row(*row) for row in rows)
+
+    def _rows(self, entries, start_field):
+        entries = entries.filter(task__project=self.project)
+        if self.date_from:
+            entries = entries.filter(**{f'{start_field}__gte': self.date_from})
+        if self.date_to:
+            entries = entries.filter(**{f'{start_field}__lt': self.date_to})
+        return entries.annotate(
+            duration=ExpressionWrapper(F('end_datetime') - F(start_field), output_field=DurationField())
+        ).order_by(start_field, 'pk').values_list(
+            'uuid', 'task__uuid', 'task__title', start_field, 'end_datetime', 'duration'
+        ).iterator(chunk_size=self.chunk_size)
+
+    def _format_row(self, uuid, task_uuid, task_title, start, end, duration):
+        return (
+            str(uuid),
+            str(task_uuid),
+            task_title,
+            start.isoformat(),
+            end.isoformat() if end else None,
+            int(duration.total_seconds()) if duration is not None else None,
+        )
+
+
+ImportRejection = namedtuple('ImportRejection', ('line', 'error'))
+
+
+class ImportResult(namedtuple('ImportResult', ('imported', 'rejected', 'elapsed'))):
+    @property
+    def rows_per_second(self):
+        rows = self.imported + len(self.rejected)
+        return rows / self.elapsed if self.elapsed else 0
+
+
+class ImportTimeEntriesService(AbstractService):
+    """Import finished time entries of `user` from `rows`, an iterable of `(line_number, row)` tuples
+
+    Each row is a dict with `project` and `task` (UUID or title), `start` and `end` (ISO 8601 datetimes). Projects
+    and tasks are resolved through in-memory maps loaded once, and missing ones are created by title unless
+    `create_missing` is False. Rows whose span overlaps an existing or already imported entry of the same task are
+    rejected. Valid rows are inserted `batch_size` at a time, each batch in its own transaction.
+    """
+    # End of running entries' spans, so nothing can be imported after them
+    END_OF_TIME = datetime.max.replace(tzinfo=dt_timezone.utc)
+    user = None
+    rows = None
+    batch_size = 1000
+    create_missing = True
+
+    def execute(self):
+        started = time.perf_counter()
+        self._imported = 0
+        self._rejected = []
+        self._load_maps()
+        batch = []
+        for line, row in self.rows:
+            batch.append((line, row))
+            if len(batch) == self.batch_size:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+        return ImportResult(self._imported, self._rejected, time.perf_counter() - started)
+
+    def _load_maps(self):
+        self._projects_by_uuid = {}
+        self._projects_by_title = {}
+        for project in Project.objects.user_projects(self.user).order_by('created_at'):
+            self._projects_by_uuid[str(project.uuid)] = project
+            if not project.is_deleted:
+                self._projects_by_title.setdefault(project.title, project)
+        self._tasks_by_uuid = {}
+        self._tasks_by_title = {}
+        for task in Task.objects.filter(project__created_by=self.user).order_by('created_at').only(
+            'uuid', 'title', 'project_id'
+        ):
+            self._tasks_by_uuid[str(task.uuid)] = task
+            self._tasks_by_title.setdefault((task.project_id, task.title), task)
+        # Sorted `(start, end)` spans of each task, loaded from database the first time a task is seen
+        self._spans = {}
+
+    def _import_batch(self, batch):
+        accepted = []
+        with transaction.atomic():
+            for line, row in batch:
+                try:
+                    accepted.append(self._validate(row))
+                except InvalidImportRow as e:
+                    self._rejected.append(ImportRejection(line, str(e)))
+            if not accepted:
+                return
+            entries = TaskTimeEntry.objects.bulk_create([
+                TaskTimeEntry(task_id=task.pk, created_at=start, end_datetime=end) for task, start, end in accepted
+            ])
+            finished_entries = [
+                FinishedEntry(None, task.pk, task.uuid, task.project_id, self.user.pk, start, end, entry.uuid)
+                for (task, start, end), entry in zip(accepted, entries)
+            ]
+            Task.objects.add_finished_entries(finished_entries)
+            time_entries_finished.send(sender=TaskTimeEntry, entries=finished_entries)
+        self._imported += len(accepted)
+
+    def _validate(self, row):
+        if not row:
+            raise InvalidImportRow('Malformed row')
+        project_reference = self._required(row, 'project')
+        task_reference = self._required(row, 'task')
+        start = self._parse_datetime(row, 'start')
+        end = self._parse_datetime(row, 'end')
+        if end <= start:
+            raise InvalidImportRow('`end` must be after `start`')
+        project = self._find_project(project_reference)
+        task = self._find_task(project or project_reference, task_reference)
+        if task is not None:
+            self._add_span(task, start, end)
+            return task, start, end
+        # Missing projects and tasks are created once nothing else can reject the row, a new task has no entries
+        if project is None:
+            project = Project.objects.create(title=project_reference, created_by=self.user)
+            self._projects_by_uuid[str(project.uuid)] = self._projects_by_title[project.title] = project
+        task = Task.objects.create(title=task_reference, project=project)
+        self._tasks_by_uuid[str(task.uuid)] = self._tasks_by_title[(project.pk, task.title)] = task
+        self._spans[task.pk] = [(start, end)]
+        return task, start, end
+
+    def _required(self, row, field):
+        value = row.get(field)
+        if value is None or not str(value).strip():
+            raise InvalidImportRow(f'`{field}` is required')
+        return str(value).strip()
+
+    def _parse_datetime(self, row, field):
+        try:
+            value = parse_datetime(self._required(row, field))
+        except ValueError:
+            value = None
+        if value is None:
+            raise InvalidImportRow(f'`{field}` is not a valid ISO 8601 datetime')
+        return value if timezone.is_aware(value) else timezone.make_aware(value)
+
+    def _find_project(self, reference):
+        """Return the project of `reference`, or None if it is missing and may be created"""
+        project = self._projects_by_uuid.get(reference) or self._projects_by_title.get(reference)
+        if project is None and not self.create_missing:
+            raise InvalidImportRow(f'Project `{reference}` not found')
+        return project
+
+    def _find_task(self, project, reference):
+        """Return the task of `reference` in `project`, or None if it is missing and may be created
+
+        `project` is the reference of a project which doesn't exist yet, or a `Project`.
+        """
+        task = self._tasks_by_uuid.get(reference)
+        if task is not None and task.project_id != getattr(project, 'pk', None):
+            raise InvalidImportRow(f'Task `{reference}` does not belong to project `{project}`')
+        if task is None and isinstance(project, Project):
+            task = self._tasks_by_title.get((project.pk, reference))
+        if task is None and not self.create_missing:
+            raise InvalidImportRow(f'Task `{reference}` not found')
+        return task
+
+    def _add_span(self, task, start, end):
+        if task.pk not in self._spans:
+            self._spans[task.pk] = sorted(chain(
+                (
+                    (entry_start, entry_end or self.END_OF_TIME)
+                    for entry_start, entry_end in task.time_entries.values_list('created_at', 'end_datetime')
+                ),
+                task.archived_time_entries.values_list('start_datetime', 'end_datetime'),
+            ))
+        spans = self._spans[task.pk]
+        index = bisect.bisect(spans, (start, end))
+        if (index > 0 and spans[index - 1][1] > start) or (index < len(spans) and spans[index][0] < end):
+            raise InvalidImportRow('Time entry overlaps another time entry of the task')
+        spans.insert(index, (start, end))
+
+
+class SeedTrackerService(AbstractService):
+    """Generate synthetic users, projects, tasks and finished time entries with `bulk_create()`
+
+    Every user is active, has an auth token and `password` as password. Entries last `entry_duration` and follow each
+    other backwards from now. Return the list of created users.
+    """
+    users = 1
+    projects_per_user = 1
+    tasks = 1
+    entries = 1
+    password = 'P@ssw0rd!@#'
+    entry_duration = timedelta(minutes=30)
+    batch_size = 1000
+
+    def execute(self):
+        prefix = uuid4().hex[:8]
+        with transaction.atomic():
+            users = self._create_users(prefix)
+            projects = self._create_projects(prefix, users)
+            tasks = self._create_tasks(projects)
+            # Rows inserted in bulk send no `post_save`, entries are logged by `time_entries_finished`
+            ChangeLogEntry.objects.record(
+                [(project.created_by_id, ChangeLogEntry.PROJECT, project.uuid) for project in projects] +
+                [(task.project.created_by_id, ChangeLogEntry.TASK, task.uuid) for task in tasks]
+            )
+            self._create_entries(tasks)
+        return users
+
+    def _create_users(self, prefix):
+        password = make_password(self.password)
+        users = User.objects.bulk_create([
+            User(email=f'seed-{prefix}-{index}@tracker.test', username=f'seed-{prefix}-{index}@tracker.test',
+                 password=password, is_active=True)
+            for index in range(self.users)
+        ], batch_size=self.batch_size)
+        Token.objects.bulk_create(
+            [Token(key=Token.generate_key(), user=user) for user in users], batch_size=self.batch_size
+        )
+        return users
+
+    def _create_projects(self, prefix, users):
+        return Project.objects.bulk_create([
+            Project(title=f'Project {index}', slug=slugify(f'seed {prefix} {user.pk} {index}'), created_by=user)
+            for user in users
+            for index in range(self.projects_per_user)
+        ], batch_size=self.batch_size)
+
+    def _create_tasks(self, projects):
+        tracked_seconds = self.entries * int(self.entry_duration.total_seconds())
+        return Task.objects.bulk_create([
+            Task(title=f'Task {index}', project=project, accumulated_seconds=tracked_seconds)
+            for project in projects
+            for index in range(self.tasks)
+        ], batch_size=self.batch_size)
+
+    def _create_entries(self, tasks):
+        now = timezone.now()
+        entries = []
+        for task in tasks:
+            for index in range(1, self.entries + 1):
+                start = now - index * 2 * self.entry_duration
+                entries.append(TaskTimeEntry(task=task, created_at=start, end_datetime=start + self.entry_duration))
+                if len(entries) == self.batch_size:
+                    self._insert_entries(entries)
+                    entries = []
+        if entries:
+            self._insert_entries(entries)
+
+    def _insert_entries(self, entries):
+        TaskTimeEntry.objects.bulk_create(entries)
+        time_entries_finished.send(sender=TaskTimeEntry, entries=[
+            FinishedEntry(
+                None, entry.task.pk, entry.task.uuid, entry.task.project_id, entry.task.project.created_by_id,
+                entry.created_at, entry.end_datetime, entry.uuid
+            )
+            for entry in entries
+        ])
@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+
+# Sent inside the transaction that finishes time entries, with `entries`: a list of `FinishedEntry` tuples. When a
+# single entry is finished by saving it, `instance` is that `TaskTimeEntry`, which was also sent by `post_save`
+time_entries_finished = Signal()
+
+# Sent inside the transaction that starts time entries, with `entries`: a list of `StartedEntry` tuples, and `instance`
+# like `time_entries_finished`
+time_entries_started = Signal()
@@ -0,0 +1,166 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+from rest_framework.exceptions import AuthenticationFailed
+from apps.user.authentication import CachedTokenAuthentication
+from .events import format_sse, get_broker
+from .models import Project
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import TimeEntryExportQuerySerializer
+from .services import ExportTimeEntriesService
+
+
+def _close_old_connections():
+    # Streams are served outside of Django's request handling, which closes stale connections around each request.
+    # A connection in a transaction (e.g. of a test case) is left alone.
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def database_sync_to_async(function):
+    """Like `sync_to_async()`, closing stale and broken database connections before and after calling `function`"""
+    def call(*args, **kwargs):
+        _close_old_connections()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _close_old_connections()
+    return sync_to_async(call)
+
+
+class TokenAuthenticatedStream:
+    """Base ASGI application for GET streams served outside of Django
+
+    The token is read from the `Authorization: Token <key>` header or, as `EventSource` cannot set headers, from the
+    `token` query parameter.
+    """
+    async def __call__(self, scope, receive, send):
+        if scope['method'] != 'GET':
+            return await self._respond(send, 405, b'Method not allowed')
+        user = await self._authenticate(scope)
+        if user is None:
+            return await self._respond(send, 401, b'Invalid token')
+        await self.stream(user, scope, receive, send)
+
+    async def stream(self, user, scope, receive, send):
+        raise NotImplementedError('`stream()` method must be implemented in your derived class')
+
+    def _query(self, scope):
+        return {name: values[0] for name, values in parse_qs(scope['query_string'].decode()).items()}
+
+    async def _authenticate(self, scope):
+        headers = dict(scope['headers'])
+        keyword, _, key = headers.get(b'authorization', b'').decode().partition(' ')
+        if keyword != 'Token':
+            key = self._query(scope).get('token', '')
+        if not key:
+            return None
+        try:
+            user, _ = await database_sync_to_async(CachedTokenAuthentication().authenticate_credentials)(key)
+        except AuthenticationFailed:
+            return None
+        return user
+
+    async def _respond(self, send, status, body, content_type=b'text/plain'):
+        await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-type', content_type)]})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class TimerEventsStream(TokenAuthenticatedStream):
+    """ASGI application streaming the `started` and `stopped` timer events of the authenticated user as SSE
+
+    A comment is sent every `keepalive` seconds so proxies keep the connection open.
+    """
+    keepalive = 15
+
+    async def stream(self, user, scope, receive, send):
+        broker = get_broker()
+        queue = broker.subscribe(user.pk)
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+            await send({'type': 'http.response.body', 'body': b': connected\n\n', 'more_body': True})
+            await self._stream(queue, receive, send)
+        finally:
+            broker.unsubscribe(user.pk, queue)
+
+    async def _stream(self, queue, receive, send):
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            while True:
+                next_event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    (next_event, disconnected), timeout=self.keepalive, return_when=asyncio.FIRST_COMPLETED
+                )
+                if disconnected in done:
+                    next_event.cancel()
+                    return
+                if next_event in done:
+                    body = format_sse(next_event.result())
+                else:
+                    next_event.cancel()
+                    body = b': keepalive\n\n'
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+        finally:
+            disconnected.cancel()
+
+    async def _wait_for_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+
+class TimeEntryExportStream(TokenAuthenticatedStream):
+    """ASGI application streaming the time entries export of a project, like `ProjectViewSet.export_time_entries`
+
+    Django 4.1 iterates streaming responses synchronously inside the event loop, where the ORM cannot run, so under
+    ASGI the export is served here and every chunk is read from database in Django's sync thread. The project's uuid
+    is read from `scope['url_route']['kwargs']`.
+    """
+    renderers = {renderer.format: renderer for renderer in (CSVRenderer(), NDJSONRenderer())}
+
+    async def stream(self, user, scope, receive, send):
+        query = self._query(scope)
+        renderer = self._renderer(scope, query)
+        if renderer is None:
+            return await self._respond(send, 404, b'Not found')
+        serializer = TimeEntryExportQuerySerializer(data=query)
+        if not serializer.is_valid():
+            return await self._respond(send, 400, json.dumps(serializer.errors).encode(), b'application/json')
+        await self._export(user, scope, query, serializer.validated_data, renderer, send)
+
+    async def _export(self, user, scope, query, filters, renderer, send):
+        project = await database_sync_to_async(self._get_project)(user, scope['url_route']['kwargs']['uuid'], query)
+        if project is None:
+            return await self._respond(send, 404, b'Not found')
+        service = ExportTimeEntriesService(project=project, date_from=filters.get('from'), date_to=filters.get('to'))
+        chunks = renderer.stream(service.COLUMNS, service.execute())
+        filename = f'{project.slug}-time-entries.{renderer.format}'
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', f'{renderer.media_type}; charset={renderer.charset}'.encode()),
+            (b'content-disposition', f'attachment; filename="{filename}"'.encode()),
+        ]})
+        # Chunks are read by the same cursor, so its connection is only checked once the export is over
+        next_chunk = sync_to_async(next)
+        try:
+            while (chunk := await next_chunk(chunks, None)) is not None:
+                await send({'type': 'http.response.body', 'body': chunk.encode(renderer.charset), 'more_body': True})
+        finally:
+            await sync_to_async(_close_old_connections)()
+        await send({'type': 'http.response.body'})
+
+    def _renderer(self, scope, query):
+        if 'format' in query:
+            return self.renderers.get(query['format'])
+        accept = dict(scope['headers']).get(b'accept', b'').decode()
+        return self.renderers['ndjson'] if NDJSONRenderer.media_type in accept else self.renderers['csv']
+
+    def _get_project(self, user, uuid, query):
+        projects = Project.objects.user_projects(user)
+        if not query.get('deleted'):
+            projects = projects.non_deleted()
+        return projects.filter(uuid=uuid).first()
@@ -0,0 +1,72 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ..models import Project, Task
+from apps.user.models import User
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.token = Token.objects.create(user=self.user)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.tasks = [Task.objects.create(title=f"Task {index}", project=self.project) for index in range(3)]
+        self.tasks[0].start()
+
+    async def _get(self, url, token=None):
+        return await self.async_client.get(url, AUTHORIZATION=f'Token {token or self.token.key}')
+
+    async def test_unauthenticated_requests_are_rejected(self):
+        response = await self.async_client.get(reverse('project:async_project_list'))
+        self.assertEqual(response.status_code, 401)
+        response = await self._get(reverse('project:async_project_list'), token='invalid')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_project_list_matches_sync_list(self):
+        response = await self._get(reverse('project:async_project_list'))
+        self.assertEqual(response.status_code, 200)
+        project = response.json()['results'][0]
+        self.assertEqual((project['uuid'], project['owner']), (str(self.project.uuid), str(self.user)))
+
+    async def test_task_list_is_paginated(self):
+        url = reverse('project:async_task_list', kwargs={'project_uuid': self.project.uuid})
+        uuids = []
+        url = f'{url}?page_size=2'
+        while url:
+            response = (await self._get(url)).json()
+            uuids += [task['uuid'] for task in response['results']]
+            url = response['next']
+        self.assertEqual(uuids, [str(task.uuid) for task in reversed(self.tasks)])
+
+    async def test_task_list_pages_like_sync_list(self):
+        url = reverse('project:async_task_list', kwargs={'project_uuid': self.project.uuid})
+        sync_url = reverse('project:task_apis-list', kwargs={'project__uuid': self.project.uuid})
+        response = (await self._get(f'{url}?page_size=2')).json()
+        self.assertIsNone(response['previous'])
+        sync_response = (await self._get(f'{sync_url}?page_size=2')).json()
+        self.assertEqual(response['next'].split('cursor=')[1], sync_response['next'].split('cursor=')[1])
+        response = (await self._get(response['next'])).json()
+        self.assertEqual([task['uuid'] for task in response['results']], [str(self.tasks[0].uuid)])
+        response = (await self._get(response['previous'])).json()
+        self.assertEqual(
+            [task['uuid'] for task in response['results']], [str(task.uuid) for task in reversed(self.tasks[1:])]
+        )
+        self.assertIsNone(response['previous'])
+
+    async def test_invalid_cursor_is_not_found(self):
+        url = reverse('project:async_task_list', kwargs={'project_uuid': self.project.uuid})
+        self.assertEqual((await self._get(f'{url}?cursor=invalid')).status_code, 404)
+
+    async def test_task_list_of_other_users_project_is_not_found(self):
+        other_user = await User.objects.acreate(email="dummy_email_b@gmail.com", is_active=True)
+        other_token = await Token.objects.acreate(user=other_user)
+        url = reverse('project:async_task_list', kwargs={'project_uuid': self.project.uuid})
+        self.assertEqual((await self._get(url, token=other_token.key)).status_code, 404)
+
+    async def test_timer_status_lists_running_tasks(self):
+        response = (await self._get(reverse('project:async_timer_status'))).json()
+        self.assertEqual(response['count'], 1)
+        self.assertEqual(response['timers'][0]['task'], str(self.tasks[0].uuid))
+        await sync_to_async(self.tasks[0].stop)()
+        self.assertEqual((await self._get(reverse('project:async_timer_status'))).json()['count'], 0)
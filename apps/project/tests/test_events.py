@@ -0,0 +1,90 @@
+import asyncio
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from ..events import LocalEventBroker, get_broker
+from ..models import Project, Task
+from ..streams import TimerEventsStream
+from apps.user.models import User
+
+
+class TimerEventTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+
+    def test_events_are_published_on_commit(self):
+        with mock.patch.object(get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.task.start()
+                self.assertFalse(publish.called)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.project.stop_all_tasks()
+        (started_user, started), _ = publish.call_args_list[0]
+        (stopped_user, stopped), _ = publish.call_args_list[1]
+        self.assertEqual((started_user, started['event'], started['task']), (self.user.pk, 'started', str(self.task.uuid)))
+        self.assertEqual((stopped_user, stopped['event']), (self.user.pk, 'stopped'))
+        self.assertEqual(stopped['start'], started['start'])
+        self.assertIsInstance(stopped['duration'], int)
+
+    async def test_broker_delivers_events_of_the_user_only(self):
+        broker = LocalEventBroker()
+        queue = broker.subscribe(1)
+        await asyncio.get_running_loop().run_in_executor(None, broker.publish, 2, {'event': 'started'})
+        await asyncio.get_running_loop().run_in_executor(None, broker.publish, 1, {'event': 'stopped'})
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), {'event': 'stopped'})
+        self.assertTrue(queue.empty())
+        broker.unsubscribe(1, queue)
+
+    def test_subscribers_of_closed_loops_are_removed(self):
+        broker = LocalEventBroker()
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(self._subscribe(broker, 1))
+        loop.close()
+        broker.publish(1, {'event': 'started'})
+        self.assertEqual(broker._subscribers, {})
+
+    async def _subscribe(self, broker, user_id):
+        return broker.subscribe(user_id)
+
+
+class TimerEventsStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.token = Token.objects.create(user=self.user)
+
+    def _communicator(self, query_string=b''):
+        return ApplicationCommunicator(TimerEventsStream(), {
+            'type': 'http', 'method': 'GET', 'path': '/api/v1/events/', 'headers': [], 'query_string': query_string
+        })
+
+    async def test_old_connections_are_closed_around_authentication(self):
+        communicator = self._communicator(b'token=invalid')
+        with mock.patch('apps.project.streams.connection', in_atomic_block=False), \
+                mock.patch('apps.project.streams.close_old_connections') as close_old_connections:
+            await communicator.send_input({'type': 'http.request'})
+            await communicator.receive_output(1)
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    async def test_invalid_token_is_rejected(self):
+        communicator = self._communicator(b'token=invalid')
+        await communicator.send_input({'type': 'http.request'})
+        self.assertEqual((await communicator.receive_output(1))['status'], 401)
+
+    async def test_events_are_streamed(self):
+        communicator = self._communicator(f'token={self.token.key}'.encode())
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(1)
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+        await communicator.receive_output(1)
+        await sync_to_async(get_broker().publish)(self.user.pk, {'event': 'started', 'task': 'uuid'})
+        body = (await communicator.receive_output(1))['body'].decode()
+        self.assertTrue(body.startswith('event: started\ndata: '))
+        self.assertEqual(json.loads(body.split('data: ')[1]), {'event': 'started', 'task': 'uuid'})
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(1)
@@ -1,14 +1,18 @@
 from datetime import timedelta
-from django.test import TestCase
+from unittest import mock
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from django.core.cache import cache
-from ..models import ProjectSetting, Project, Task, TaskTimeEntry
+from django.db.models import F
+from ..exceptions import CuncurrentTaskException
+from ..models import ChangeLogEntry, ProjectSetting, Project, Task, TaskTimeEntry
 from apps.user.models import User
 
 
+@override_settings(SINGLETON_VERSION_CHECK_INTERVAL=0)
 class ProjectSettingTests(TestCase):
     def test_setting_is_singleton(self):
-        cache.delete(ProjectSetting.__name__)
         self.assertEqual(ProjectSetting.objects.count(), 0)
         setting_1 = ProjectSetting.load()
         self.assertEqual(ProjectSetting.objects.count(), 1)
@@ -19,13 +23,11 @@ class ProjectSettingTests(TestCase):
         self.assertEqual(setting_1.id, setting_3.id)
 
     def test_cannot_delete_setting(self):
-        cache.delete(ProjectSetting.__name__)
         with self.assertRaises(AttributeError):
             setting = ProjectSetting.load()
             setting.delete()
         
     def test_update_dont_change_pk(self):
-        cache.delete(ProjectSetting.__name__)
         setting = ProjectSetting.load()
         setting.concurrent_tasks = True
         setting.save()
@@ -34,6 +36,47 @@ class ProjectSettingTests(TestCase):
         setting.save()
         self.assertEqual(setting.pk, 1)
 
+
+    @override_settings(SINGLETON_VERSION_CHECK_INTERVAL=60000)
+    def test_loaded_setting_is_kept_in_process(self):
+        ProjectSetting.load()
+        with CaptureQueriesContext(connection) as context:
+            ProjectSetting.load()
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_unchanged_setting_is_not_read_again(self):
+        setting = ProjectSetting.load()
+        with CaptureQueriesContext(connection) as context:
+            self.assertIs(ProjectSetting.load(), setting)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('concurrent_tasks', context.captured_queries[0]['sql'])
+
+    def test_saves_of_other_processes_are_loaded(self):
+        setting = ProjectSetting.load()
+        setting.save()
+        # Another process saves the setting
+        ProjectSetting.objects.filter(pk=1).update(
+            concurrent_tasks=not setting.concurrent_tasks, updated_at=timezone.now()
+        )
+        self.assertNotEqual(ProjectSetting.load().concurrent_tasks, setting.concurrent_tasks)
+
+    @override_settings(SINGLETON_VERSION_CHECK_INTERVAL=60000)
+    def test_version_is_checked_at_most_once_per_interval(self):
+        setting = ProjectSetting.load()
+        ProjectSetting.objects.filter(pk=1).update(updated_at=timezone.now())
+        self.assertIs(ProjectSetting.load(), setting)
+
+    @override_settings(SINGLETON_VERSION_CHECK_INTERVAL=60000)
+    def test_rolled_back_saves_are_not_loaded(self):
+        setting = ProjectSetting.load()
+        with self.captureOnCommitCallbacks(execute=True):
+            setting.save()
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            setting.concurrent_tasks = not setting.concurrent_tasks
+            setting.save()
+            raise DatabaseError
+        self.assertEqual(ProjectSetting.load().concurrent_tasks, ProjectSetting.objects.get().concurrent_tasks)
+
         
 class ProjectTests(TestCase):
     def setUp(self):
@@ -67,6 +110,12 @@ class ProjectTests(TestCase):
     def test_has_any_running_task_return_false_when_there_is_no_running_task(self):
         self.assertFalse(self.project_a.has_any_running_task())
 
+    def test_has_any_running_task_uses_a_single_query(self):
+        for index in range(3):
+            Task.objects.create(title=f"Task {index}", project=self.project_a).start()
+        with self.assertNumQueries(1):
+            self.assertTrue(self.project_a.has_any_running_task())
+
     def test_stop_all_tasks_stops_tasks(self):
         task_a = Task.objects.create(title="Task", project=self.project_a)
         task_b = Task.objects.create(title="Task", project=self.project_a)
@@ -82,7 +131,17 @@ class ProjectTests(TestCase):
         task_a.start()
         task_b.start()
         stopped_tasks = self.project_a.stop_all_tasks()
-        self.assertEqual(stopped_tasks, 2)
+        self.assertEqual(len(stopped_tasks), 2)
+        self.assertEqual({entry.task_uuid for entry in stopped_tasks}, {task_a.uuid, task_b.uuid})
+
+    def test_stop_all_tasks_dont_touch_finished_entries(self):
+        task = Task.objects.create(title="Task", project=self.project_a)
+        task.start()
+        task.stop()
+        finished_entry = task.time_entries.get()
+        task.start()
+        self.assertEqual(len(self.project_a.stop_all_tasks()), 1)
+        self.assertEqual(task.time_entries.get(pk=finished_entry.pk).end_datetime, finished_entry.end_datetime)
 
     def test_stop_all_tasks_dont_stop_other_project_tasks(self):
         task_a = Task.objects.create(title="Task", project=self.project_a)
@@ -116,6 +175,12 @@ class TaskTests(TestCase):
         user_finished_tasks = Task.objects.user_finished_tasks(self.user_b)
         self.assertNotIn(self.task, user_finished_tasks)
 
+    def test_user_tasks_are_distinct(self):
+        for _ in range(2):
+            self.task.start()
+            self.task.stop()
+        self.assertEqual(list(Task.objects.user_finished_tasks(self.user_a)), [self.task])
+
 
     def test_get_spend_time_on_running_tasks_shouldnt_raise_error(self):
         self.task.start()
@@ -147,16 +212,65 @@ class TaskTests(TestCase):
         self.task.stop()
         self.assertEqual(self.task.time_entries.count(), 2)
 
+    def test_starting_a_running_task_is_idempotent(self):
+        stale_task = Task.objects.get(pk=self.task.pk)
+        self.assertTrue(self.task.start())
+        self.assertFalse(stale_task.start())
+        self.assertTrue(stale_task.is_running())
+        self.assertEqual(self.task.time_entries.running().count(), 1)
+
+    def test_exclusive_start_fails_when_another_task_runs_exclusively(self):
+        task_b = Task.objects.create(title="Task B", project=self.project)
+        task_c = Task.objects.create(title="Task C", project=self.project)
+        self.assertTrue(self.task.start(exclusive=True))
+        with self.assertRaises(CuncurrentTaskException):
+            task_b.start(exclusive=True)
+        self.assertFalse(task_b.is_running())
+        self.assertTrue(task_c.start())
+        self.task.stop()
+        self.assertTrue(task_b.start(exclusive=True))
+
+    def test_start_stop_task_updates_tracking_columns(self):
+        self.task.start()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.running_since, self.task.time_entries.get().start_datetime)
+        self.task.time_entries.update(created_at=F('created_at') - timedelta(seconds=15))
+        self.task.stop()
+        self.assertIsNone(self.task.running_since)
+        self.task.refresh_from_db()
+        self.assertIsNone(self.task.running_since)
+        self.assertEqual(self.task.accumulated_seconds, 15)
+
+    def test_stop_all_tasks_updates_tracking_columns(self):
+        task_b = Task.objects.create(title="Task B", project=self.project)
+        self.task.start()
+        task_b.start()
+        TaskTimeEntry.objects.update(created_at=F('created_at') - timedelta(seconds=5))
+        self.project.stop_all_tasks()
+        for task in (self.task, task_b):
+            task.refresh_from_db()
+            self.assertIsNone(task.running_since)
+            self.assertEqual(task.accumulated_seconds, 5)
+
+    def test_deleting_time_entry_updates_tracking_columns(self):
+        tte = TaskTimeEntry.objects.create(task=self.task)
+        tte.end_datetime = tte.start_datetime + timedelta(seconds=10)
+        tte.save()
+        tte.delete()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.accumulated_seconds, 0)
+
     def test_get_all_tasks_with_duration(self):
         task_b = Task.objects.create(title="Task B", project=self.project)
         task_c = Task.objects.create(title="Task C", project=self.project)
         now = timezone.now()
-        taa = TaskTimeEntry.objects.create(task=self.task)
-        tab = TaskTimeEntry.objects.create(task=self.task)
-        tac = TaskTimeEntry.objects.create(task=self.task)
-        tba = TaskTimeEntry.objects.create(task=task_b)
-        tca = TaskTimeEntry.objects.create(task=task_c)
-        tcb = TaskTimeEntry.objects.create(task=task_c)
+        # A task can have a single open entry, so entries are created finished
+        taa = TaskTimeEntry.objects.create(task=self.task, end_datetime=now)
+        tab = TaskTimeEntry.objects.create(task=self.task, end_datetime=now)
+        tac = TaskTimeEntry.objects.create(task=self.task, end_datetime=now)
+        tba = TaskTimeEntry.objects.create(task=task_b, end_datetime=now)
+        tca = TaskTimeEntry.objects.create(task=task_c, end_datetime=now)
+        tcb = TaskTimeEntry.objects.create(task=task_c, end_datetime=now)
         taa.created_at = tab.created_at = tac.created_at = tba.created_at = tca.created_at = tcb.created_at = now
         taa.end_datetime = now + timedelta(seconds=20)
         tab.end_datetime = None
@@ -193,7 +307,33 @@ class TaskTimeEntryTests(TestCase):
         self.tte.refresh_from_db()
         self.assertTrue(self.tte.is_finished())
 
+    def test_finish_updates_task_tracking_columns(self):
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_running())
+        self.tte.finish()
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.is_running())
+        self.assertEqual(self.task.accumulated_seconds, self.tte.duration_in_sec)
+
+    def test_past_entries_are_inserted_with_their_start(self):
+        start = timezone.now() - timedelta(days=3)
+        entry, = TaskTimeEntry.objects.bulk_create([
+            TaskTimeEntry(task=self.task, created_at=start, end_datetime=start + timedelta(seconds=10))
+        ])
+        self.assertEqual(TaskTimeEntry.objects.get(uuid=entry.uuid).start_datetime, start)
+
     def test_start_datetime_is_created_at(self):
         self.tte.finish()
         self.assertEqual(self.tte.created_at, self.tte.start_datetime)
 
+    def test_started_and_finished_entries_are_logged_once(self):
+        self.tte.delete()
+        start = lambda: TaskTimeEntry.objects.create(task=self.task)
+        finish = lambda: self.task.time_entries.get().finish()
+        for change in (start, finish):
+            logged = ChangeLogEntry.objects.count()
+            with mock.patch('apps.project.receivers.bump_data_version') as bump_data_version:
+                change()
+            self.assertEqual(ChangeLogEntry.objects.count() - logged, 2)
+            bump_data_version.assert_called_once_with(self.user.pk)
+
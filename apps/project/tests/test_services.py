@@ -0,0 +1,329 @@
+from datetime import datetime, timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ..exceptions import CuncurrentTaskException
+from ..models import ArchivedTimeEntry, ChangeLogEntry, Project, ProjectSetting, Task, TaskTimeEntry, TimerAutoStop
+from ..services import (
+    ArchiveTimeEntriesService, BatchTaskOperationsService, ExportTimeEntriesService, StopStaleTimersService, RebuildTaskTrackingService, ImportTimeEntriesService, SeedTrackerService
+)
+from apps.user.models import User
+
+
+class RebuildTaskTrackingServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com")
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.finished_task = Task.objects.create(title="Task A", project=self.project)
+        self.running_task = Task.objects.create(title="Task B", project=self.project)
+        tte = TaskTimeEntry.objects.create(task=self.finished_task)
+        tte.end_datetime = tte.start_datetime + timedelta(seconds=10)
+        tte.save()
+        self.running_task.start()
+
+    def test_tasks_in_sync_are_not_rebuilt(self):
+        self.assertEqual(RebuildTaskTrackingService(commit=False).execute(), 0)
+
+    def test_out_of_sync_tasks_are_rebuilt(self):
+        Task.objects.update(running_since=None, accumulated_seconds=100)
+        self.assertEqual(RebuildTaskTrackingService(commit=False, batch_size=1).execute(), 2)
+        self.assertEqual(RebuildTaskTrackingService(batch_size=1).execute(), 2)
+        self.finished_task.refresh_from_db()
+        self.running_task.refresh_from_db()
+        self.assertEqual(self.finished_task.accumulated_seconds, 10)
+        self.assertIsNone(self.finished_task.running_since)
+        self.assertEqual(self.running_task.accumulated_seconds, 0)
+        self.assertEqual(self.running_task.running_since, self.running_task.time_entries.get().start_datetime)
+        self.assertEqual(RebuildTaskTrackingService(commit=False).execute(), 0)
+
+
+class ImportTimeEntriesServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com")
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+
+    def _import(self, *rows, **kwargs):
+        service = ImportTimeEntriesService(user=self.user, rows=enumerate(rows, start=1), batch_size=2, **kwargs)
+        return service.execute()
+
+    def _row(self, project, task, start, seconds):
+        start = timezone.make_aware(datetime(2022, 9, 12, 10)) + timedelta(seconds=start)
+        end = start + timedelta(seconds=seconds)
+        return {'project': project, 'task': task, 'start': start.isoformat(), 'end': end.isoformat()}
+
+    def test_import_resolves_tasks_by_uuid_and_title(self):
+        result = self._import(
+            self._row(str(self.project.uuid), str(self.task.uuid), 0, 10),
+            self._row("Project A", "Task A", 20, 30),
+            self._row("Project A", "Task A", 100, 5),
+        )
+        self.assertEqual((result.imported, result.rejected), (3, []))
+        self.assertEqual(self.task.time_entries.count(), 3)
+        self.assertEqual(
+            self.task.time_entries.order_by('created_at').first().start_datetime,
+            timezone.make_aware(datetime(2022, 9, 12, 10))
+        )
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.accumulated_seconds, 45)
+        self.assertEqual(self.user.time_rollups.get().seconds, 45)
+
+    def test_import_creates_missing_projects_and_tasks(self):
+        result = self._import(self._row("Project B", "Task B", 0, 10), self._row("Project B", "Task B", 10, 10))
+        self.assertEqual(result.imported, 2)
+        task = Task.objects.get(title="Task B", project__title="Project B", project__created_by=self.user)
+        self.assertEqual(task.time_entries.count(), 2)
+
+    def test_import_without_creating_missing_rejects_rows(self):
+        result = self._import(self._row("Project B", "Task B", 0, 10), create_missing=False)
+        self.assertEqual(result.imported, 0)
+        self.assertEqual(result.rejected[0].line, 1)
+        self.assertFalse(Project.objects.filter(title="Project B").exists())
+
+    def test_rejected_rows_do_not_create_projects_and_tasks(self):
+        result = self._import(
+            {'project': "Project B", 'task': "Task B", 'start': 'yesterday', 'end': 'today'},
+            self._row("Project C", "Task C", 20, -10),
+            self._row("Project D", str(self.task.uuid), 0, 10),
+            self._row("Project A", "Task E", 20, -10),
+        )
+        self.assertEqual([rejection.line for rejection in result.rejected], [1, 2, 3, 4])
+        self.assertEqual(list(Project.objects.values_list('title', flat=True)), ["Project A"])
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ["Task A"])
+
+    def test_import_rejects_invalid_and_overlapping_rows(self):
+        self.task.start()
+        result = self._import(
+            self._row("Project A", "Task A", 0, 10),
+            self._row("Project A", "Task A", 5, 10),
+            self._row("Project A", "Task A", 20, -10),
+            {'project': "Project A", 'task': "Task A", 'start': 'yesterday', 'end': 'today'},
+            None,
+            self._row("Project A", "Task A", 86400 * 365 * 100, 10),
+        )
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([rejection.line for rejection in result.rejected], [2, 3, 4, 5, 6])
+
+
+class SeedTrackerServiceTests(TestCase):
+    def test_seeded_data_is_consistent(self):
+        users = SeedTrackerService(users=2, projects_per_user=2, tasks=3, entries=4).execute()
+        self.assertEqual(len(users), 2)
+        self.assertTrue(users[0].check_password(SeedTrackerService.password))
+        self.assertEqual(Project.objects.user_projects(users[0]).count(), 2)
+        self.assertEqual(Task.objects.count(), 12)
+        self.assertEqual(TaskTimeEntry.objects.count(), 48)
+        self.assertFalse(TaskTimeEntry.objects.running().exists())
+        self.assertEqual(RebuildTaskTrackingService(commit=False).execute(), 0)
+
+
+class BatchTaskOperationsServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com")
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.tasks = [Task.objects.create(title=f"Task {index}", project=self.project) for index in range(3)]
+        self.now = timezone.now()
+        self._set_concurrent_tasks(True)
+
+    def _set_concurrent_tasks(self, enabled):
+        setting = ProjectSetting.load()
+        setting.concurrent_tasks = enabled
+        setting.save()
+
+    def _execute(self, *operations):
+        return BatchTaskOperationsService(user=self.user, operations=[
+            {'task': task.uuid, 'action': action, 'timestamp': timestamp} for task, action, timestamp in operations
+        ]).execute()
+
+    def test_operations_are_applied_in_order(self):
+        self.tasks[0].start()
+        results = self._execute(
+            (self.tasks[0], 'stop', None),
+            (self.tasks[1], 'start', self.now - timedelta(seconds=60)),
+            (self.tasks[1], 'stop', self.now - timedelta(seconds=20)),
+            (self.tasks[2], 'start', self.now - timedelta(seconds=30)),
+        )
+        self.assertEqual([result.status for result in results], ['stopped', 'started', 'stopped', 'started'])
+        self.assertEqual(results[2].duration, 40)
+        for task in self.tasks:
+            task.refresh_from_db()
+        self.assertFalse(self.tasks[0].is_running())
+        self.assertEqual(self.tasks[1].accumulated_seconds, 40)
+        self.assertEqual(self.tasks[2].running_since, self.now - timedelta(seconds=30))
+        self.assertEqual(RebuildTaskTrackingService(commit=False).execute(), 0)
+
+    def test_invalid_operations_are_rejected(self):
+        other_task = Task.objects.create(
+            title="Task", project=Project.objects.create(
+                title="Project B", created_by=User.objects.create(email="dummy_email_b@gmail.com")
+            )
+        )
+        results = self._execute(
+            (other_task, 'start', None),
+            (self.tasks[0], 'stop', None),
+            (self.tasks[1], 'start', self.now + timedelta(minutes=1)),
+            (self.tasks[2], 'start', None),
+            (self.tasks[2], 'start', None),
+        )
+        self.assertEqual(
+            [result.status for result in results], ['rejected', 'rejected', 'rejected', 'started', 'already_running']
+        )
+        self.assertEqual(results[0].error, 'Task not found')
+        self.assertFalse(other_task.time_entries.exists())
+
+    def test_concurrent_tasks_setting_is_respected(self):
+        self._set_concurrent_tasks(False)
+        results = self._execute((self.tasks[0], 'start', None), (self.tasks[1], 'start', None))
+        self.assertEqual([result.status for result in results], ['started', 'rejected'])
+        results = self._execute((self.tasks[0], 'stop', None), (self.tasks[1], 'start', None))
+        self.assertEqual([result.status for result in results], ['stopped', 'started'])
+        self.assertEqual(TaskTimeEntry.objects.running().get().task, self.tasks[1])
+
+    def test_only_exclusively_running_tasks_block_exclusive_starts(self):
+        # Started while concurrent tasks were enabled, so `Task.start(exclusive=True)` is not blocked by it
+        self.tasks[0].start()
+        self._set_concurrent_tasks(False)
+        results = self._execute((self.tasks[1], 'start', None), (self.tasks[2], 'start', None))
+        self.assertEqual([result.status for result in results], ['started', 'rejected'])
+        with self.assertRaises(CuncurrentTaskException):
+            self.tasks[2].start(exclusive=True)
+
+
+class StopStaleTimersServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com")
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.now = timezone.now()
+        setting = ProjectSetting.load()
+        setting.auto_stop_after = timedelta(hours=8)
+        setting.save()
+
+    def _start(self, started_ago, project=None):
+        task = Task.objects.create(title="Task", project=project or self.project)
+        entry = TaskTimeEntry.objects.create(task=task)
+        TaskTimeEntry.objects.filter(pk=entry.pk).update(created_at=self.now - started_ago)
+        Task.objects.filter(pk=task.pk).update(running_since=self.now - started_ago)
+        return entry
+
+    def test_stale_entries_are_stopped_at_their_limit(self):
+        stale_entry = self._start(timedelta(days=2))
+        fresh_entry = self._start(timedelta(hours=1))
+        self.assertEqual(StopStaleTimersService().execute(), 1)
+        stale_entry.refresh_from_db()
+        self.assertEqual(stale_entry.end_datetime, stale_entry.created_at + timedelta(hours=8))
+        self.assertEqual(stale_entry.task.accumulated_seconds, 8 * 3600)
+        self.assertFalse(stale_entry.task.is_running())
+        fresh_entry.refresh_from_db()
+        self.assertFalse(fresh_entry.is_finished())
+        self.assertEqual(TimerAutoStop.objects.get().time_entry, stale_entry)
+        self.assertEqual(RebuildTaskTrackingService(commit=False).execute(), 0)
+
+    def test_project_limit_overrides_the_default(self):
+        strict_project = Project.objects.create(
+            title="Project B", created_by=self.user, auto_stop_after=timedelta(minutes=30)
+        )
+        entry = self._start(timedelta(hours=1), project=strict_project)
+        self._start(timedelta(hours=1))
+        self.assertEqual(StopStaleTimersService().execute(), 1)
+        entry.refresh_from_db()
+        self.assertEqual(entry.end_datetime, entry.created_at + timedelta(minutes=30))
+
+    def test_nothing_is_stopped_without_a_limit(self):
+        setting = ProjectSetting.load()
+        setting.auto_stop_after = None
+        setting.save()
+        self._start(timedelta(days=30))
+        self.assertEqual(StopStaleTimersService().execute(), 0)
+
+    def test_entries_are_stopped_in_batches(self):
+        for _ in range(5):
+            self._start(timedelta(days=1))
+        self.assertEqual(StopStaleTimersService(batch_size=2).execute(), 5)
+        self.assertFalse(TaskTimeEntry.objects.running().exists())
+        self.assertEqual(TimerAutoStop.objects.count(), 5)
+
+
+class ArchiveTimeEntriesServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com")
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+        self.now = timezone.now()
+        self.old_entry = self._track(timedelta(days=400), seconds=60)
+        self.recent_entry = self._track(timedelta(days=1), seconds=30)
+
+    def _track(self, started_ago, seconds):
+        entry = TaskTimeEntry.objects.create(task=self.task)
+        entry.created_at = self.now - started_ago
+        entry.end_datetime = entry.created_at + timedelta(seconds=seconds)
+        entry.save()
+        return entry
+
+    def _archive(self):
+        return ArchiveTimeEntriesService(before=self.now - timedelta(days=365), batch_size=1).execute()
+
+    def test_old_entries_are_moved_to_the_archive(self):
+        entry_changes = ChangeLogEntry.objects.filter(kind=ChangeLogEntry.TIME_ENTRY, object_uuid=self.old_entry.uuid)
+        logged = entry_changes.count()
+        self.assertEqual(self._archive(), 1)
+        self.assertEqual(list(self.task.time_entries.all()), [self.recent_entry])
+        archived_entry = ArchivedTimeEntry.objects.get()
+        self.assertEqual(archived_entry.uuid, self.old_entry.uuid)
+        self.assertEqual(archived_entry.start_datetime, self.old_entry.created_at)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.archived_duration, timedelta(seconds=60))
+        self.assertEqual(self.task.accumulated_seconds, 90)
+        # Synced clients drop archived entries
+        self.assertEqual(entry_changes.count(), logged + 1)
+        self.assertEqual(RebuildTaskTrackingService(commit=False).execute(), 0)
+        self.assertEqual(self._archive(), 0)
+
+    def test_batches_are_archived_by_a_constant_number_of_queries(self):
+        def count_archive_queries():
+            with CaptureQueriesContext(connection) as context:
+                ArchiveTimeEntriesService(before=self.now - timedelta(days=365), batch_size=100).execute()
+            return len(context.captured_queries)
+
+        few_entries_queries = count_archive_queries()
+        for index in range(10):
+            self._track(timedelta(days=500 + index), seconds=10)
+        self.assertEqual(count_archive_queries(), few_entries_queries)
+        self.assertEqual(ArchivedTimeEntry.objects.count(), 11)
+
+    def test_auto_stop_audits_are_kept(self):
+        TimerAutoStop.objects.create(
+            time_entry=self.old_entry, time_entry_uuid=self.old_entry.uuid, limit=timedelta(seconds=60)
+        )
+        self._archive()
+        audit = TimerAutoStop.objects.get()
+        self.assertEqual((audit.time_entry, audit.time_entry_uuid), (None, self.old_entry.uuid))
+
+    def test_imports_and_batches_reject_spans_overlapping_archived_entries(self):
+        self.recent_entry.delete()
+        self._archive()
+        start = self.old_entry.created_at + timedelta(seconds=30)
+        result = ImportTimeEntriesService(user=self.user, rows=[(1, {
+            'project': str(self.project.uuid), 'task': str(self.task.uuid),
+            'start': start.isoformat(), 'end': (start + timedelta(seconds=60)).isoformat(),
+        })]).execute()
+        self.assertEqual((result.imported, len(result.rejected)), (0, 1))
+        results = BatchTaskOperationsService(user=self.user, operations=[
+            {'task': self.task.uuid, 'action': 'start', 'timestamp': start}
+        ]).execute()
+        self.assertEqual(results[0].status, 'rejected')
+
+    def test_durations_and_exports_include_archived_entries(self):
+        self._archive()
+        task = self.project.get_all_tasks_with_duration().get()
+        self.assertEqual(task.duration, timedelta(seconds=90))
+        rows = list(ExportTimeEntriesService(project=self.project).execute())
+        self.assertEqual([row[0] for row in rows], [str(self.old_entry.uuid), str(self.recent_entry.uuid)])
+        self.assertEqual(rows[0][5], 60)
+
+    def test_rebuild_counts_archived_entries(self):
+        self._archive()
+        Task.objects.update(accumulated_seconds=0, archived_duration=timedelta(0))
+        self.assertEqual(RebuildTaskTrackingService().execute(), 1)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.accumulated_seconds, self.task.archived_duration), (90, timedelta(seconds=60)))
@@ -0,0 +1,577 @@
+import json
+from datetime import timedelta
+from asgiref.testing import ApplicationCommunicator
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from ..models import ChangeLogEntry, Project, ProjectSetting, Task, TaskTimeEntry
+from apps.core.testing import override_shared_cache
+from apps.user.models import User
+from tracker.asgi import application
+
+
+class TaskListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project:task_apis-list', kwargs={'project__uuid': self.project.uuid})
+
+    def _create_tasks(self, count):
+        for index in range(count):
+            task = Task.objects.create(title=f"Task {index}", project=self.project)
+            entry = TaskTimeEntry.objects.create(task=task)
+            entry.end_datetime = entry.start_datetime + timedelta(seconds=10)
+            entry.save()
+            task.start()
+
+    def _count_list_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_list_tasks_returns_running_state_and_duration(self):
+        self._create_tasks(1)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        task = response.data['results'][0]
+        self.assertTrue(task['is_running'])
+        self.assertEqual(task['duration'], 10)
+        self.assertEqual(task['project']['owner'], str(self.user))
+
+    def test_tasks_of_other_users_projects_are_not_found(self):
+        other_user = User.objects.create(email="dummy_email_b@gmail.com", is_active=True)
+        self.client.force_authenticate(other_user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.post(self.url, {'title': 'Task'}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Task.objects.exists())
+
+    def test_retrieve_task_uses_a_single_query(self):
+        task = Task.objects.create(title="Task", project=self.project)
+        url = reverse('project:task_apis-detail', kwargs={'project__uuid': self.project.uuid, 'uuid': task.uuid})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_list_tasks_uses_constant_number_of_queries(self):
+        self._create_tasks(2)
+        few_tasks_queries = self._count_list_queries()
+        self._create_tasks(10)
+        self.assertEqual(self._count_list_queries(), few_tasks_queries)
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+        self.client.force_authenticate(self.user)
+        self.task_list_url = reverse('project:task_apis-list', kwargs={'project__uuid': self.project.uuid})
+
+    def _get(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    @override_shared_cache()
+    def test_unchanged_list_is_not_modified_from_cache(self):
+        cache.clear()
+        etag = self.client.get(self.task_list_url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self._get(self.task_list_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_finished_time_entries_modify_the_task_list(self):
+        self.task.start()
+        etag = self.client.get(self.task_list_url)['ETag']
+        self.task.stop()
+        self.assertEqual(self._get(self.task_list_url, etag).status_code, status.HTTP_200_OK)
+
+    def test_created_and_deleted_rows_modify_the_list(self):
+        url = reverse('project:project_apis-list')
+        etag = self.client.get(url)['ETag']
+        project = Project.objects.create(title="Project B", created_by=self.user)
+        response = self._get(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        project.delete()
+        self.assertEqual(self._get(url, response['ETag']).status_code, status.HTTP_200_OK)
+
+    def test_deleting_and_restoring_modify_lists_and_details_with_deleted_rows(self):
+        list_url = f"{reverse('project:project_apis-list')}?deleted=1"
+        detail_url = f"{reverse('project:project_apis-detail', kwargs={'uuid': self.project.uuid})}?deleted=1"
+        list_etag, detail_etag = self.client.get(list_url)['ETag'], self.client.get(detail_url)['ETag']
+        self.project.delete()
+        response = self._get(list_url, list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['results'][0]['is_deleted'])
+        response = self._get(detail_url, detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['is_deleted'])
+        self.project.restore()
+        self.assertEqual(self._get(list_url, list_etag).status_code, status.HTTP_200_OK)
+        self.assertFalse(self._get(detail_url, response['ETag']).data['is_deleted'])
+
+    def test_detail_is_validated_by_its_project_too(self):
+        url = reverse('project:task_apis-detail', kwargs={'project__uuid': self.project.uuid, 'uuid': self.task.uuid})
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self._get(url, response['ETag']).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.project.title = "Project B"
+        self.project.save()
+        self.assertEqual(self._get(url, response['ETag']).status_code, status.HTTP_200_OK)
+
+
+class ProjectStatsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project:project_apis-list')
+
+    def _create_projects(self, count):
+        for index in range(count):
+            project = Project.objects.create(title=f"Project {index}", created_by=self.user)
+            task = Task.objects.create(title="Task A", project=project)
+            Task.objects.create(title="Task B", project=project)
+            entry = TaskTimeEntry.objects.create(task=task)
+            entry.end_datetime = entry.start_datetime + timedelta(seconds=10)
+            entry.save()
+            task.start()
+
+    def _count_list_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {'include': 'stats'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_projects_are_listed_with_stats(self):
+        self._create_projects(1)
+        project = self.client.get(self.url, {'include': 'stats'}).data['results'][0]
+        self.assertEqual(
+            (project['task_count'], project['running_task_count'], project['total_seconds']), (2, 1, 10)
+        )
+        self.assertIsNotNone(project['last_activity_at'])
+        self.assertNotIn('task_count', self.client.get(self.url).data['results'][0])
+
+    def test_query_count_does_not_depend_on_the_number_of_projects(self):
+        self._create_projects(2)
+        few_projects_queries = self._count_list_queries()
+        self._create_projects(5)
+        self.assertEqual(self._count_list_queries(), few_projects_queries)
+
+    def test_task_changes_modify_the_list(self):
+        self._create_projects(1)
+        task = Task.objects.filter(running_since__isnull=True).get()
+        etag = self.client.get(self.url, {'include': 'stats'})['ETag']
+        cache.clear()
+        self.assertEqual(
+            self.client.get(self.url, {'include': 'stats'}, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+        task.start()
+        cache.clear()
+        response = self.client.get(self.url, {'include': 'stats'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['results'][0]['running_task_count'], 2)
+        task.delete()
+        cache.clear()
+        response = self.client.get(self.url, {'include': 'stats'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.data['results'][0]['task_count'], 1)
+
+
+@override_shared_cache()
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True, is_staff=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project:task_apis-list', kwargs={'project__uuid': self.project.uuid})
+
+    def _task_duration(self):
+        return self.client.get(self.url).data['results'][0]['duration']
+
+    def test_hot_reads_are_served_from_cache(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(response.data['results'][0]['uuid'], str(self.task.uuid))
+        stats = self.client.get(reverse('core:response_cache_stats')).data
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_stop_all_tasks_invalidates_cached_responses(self):
+        entry = TaskTimeEntry.objects.create(task=self.task)
+        TaskTimeEntry.objects.filter(pk=entry.pk).update(created_at=entry.created_at - timedelta(seconds=10))
+        self.assertEqual(self._task_duration(), 0)
+        self.client.put(reverse('project:project_apis-stop-all-tasks', kwargs={'uuid': self.project.uuid}))
+        self.assertEqual(self._task_duration(), 10)
+
+    def test_other_users_writes_keep_cached_responses(self):
+        self.client.get(self.url)
+        other_user = User.objects.create(email="dummy_email_b@gmail.com", is_active=True)
+        Project.objects.create(title="Project B", created_by=other_user)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_responses_are_not_cached_in_a_process_local_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.client.get(self.url)
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+            self.assertNotEqual(len(context.captured_queries), 0)
+
+
+class StartStopTaskTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task_a = Task.objects.create(title="Task A", project=self.project)
+        self.task_b = Task.objects.create(title="Task B", project=self.project)
+        self.client.force_authenticate(self.user)
+        setting = ProjectSetting.load()
+        setting.concurrent_tasks = False
+        setting.save()
+
+    def _patch(self, task, action):
+        url = reverse(f'project:task_apis-{action}', kwargs={'project__uuid': self.project.uuid, 'uuid': task.uuid})
+        return self.client.patch(url)
+
+    def test_start_is_idempotent(self):
+        self.assertEqual(self._patch(self.task_a, 'start').status_code, status.HTTP_200_OK)
+        self.assertEqual(self._patch(self.task_a, 'start').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.task_a.time_entries.count(), 1)
+
+    def test_stop_stops_the_task(self):
+        self._patch(self.task_a, 'start')
+        self.assertEqual(self._patch(self.task_a, 'stop').status_code, status.HTTP_200_OK)
+        self.task_a.refresh_from_db()
+        self.assertFalse(self.task_a.is_running())
+        self.assertFalse(self.task_a.time_entries.running().exists())
+
+    def test_concurrent_tasks_are_rejected_unless_enabled(self):
+        self._patch(self.task_a, 'start')
+        self.assertEqual(self._patch(self.task_b, 'start').status_code, status.HTTP_400_BAD_REQUEST)
+        setting = ProjectSetting.load()
+        setting.concurrent_tasks = True
+        setting.save()
+        self.assertEqual(self._patch(self.task_b, 'start').status_code, status.HTTP_200_OK)
+        self.assertEqual(TaskTimeEntry.objects.running().count(), 2)
+
+
+class TaskBatchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.tasks = [Task.objects.create(title=f"Task {index}", project=self.project) for index in range(20)]
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project:task_batch')
+        setting = ProjectSetting.load()
+        setting.concurrent_tasks = True
+        setting.save()
+
+    def _post(self, action):
+        return self.client.post(self.url, {
+            'operations': [{'task': str(task.uuid), 'action': action} for task in self.tasks]
+        }, format='json')
+
+    def test_start_and_stop_many_tasks(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self._post('start')
+        start_queries = len(context.captured_queries)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({result['status'] for result in response.data['results']}, {'started'})
+        self.assertEqual(TaskTimeEntry.objects.running().count(), len(self.tasks))
+        self.assertLess(start_queries, len(self.tasks))
+        response = self._post('stop')
+        self.assertEqual({result['status'] for result in response.data['results']}, {'stopped'})
+        self.assertFalse(TaskTimeEntry.objects.running().exists())
+
+    def test_invalid_operations_are_bad_requests(self):
+        response = self.client.post(self.url, {'operations': [{'task': 'wrong', 'action': 'pause'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SyncTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+        self.task.start()
+        self.task.stop()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project:sync')
+
+    def _sync(self, since=0, **params):
+        response = self.client.get(self.url, {'since': since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def _uuids(self, rows):
+        return {str(row['uuid']) for row in rows}
+
+    def test_sync_from_scratch(self):
+        other_user = User.objects.create(email="dummy_email_b@gmail.com")
+        Project.objects.create(title="Project B", created_by=other_user)
+        data = self._sync()
+        self.assertEqual(self._uuids(data['projects']), {str(self.project.uuid)})
+        self.assertEqual(self._uuids(data['tasks']), {str(self.task.uuid)})
+        entry = self.task.time_entries.get()
+        self.assertEqual(data['time_entries'][0]['task'], str(self.task.uuid))
+        self.assertEqual(self._uuids(data['time_entries']), {str(entry.uuid)})
+        self.assertFalse(data['has_more'])
+        self.assertEqual(self._sync(since=data['token'])['projects'], [])
+
+    def test_only_changes_since_token_are_returned(self):
+        token = self._sync()['token']
+        other_task = Task.objects.create(title="Task B", project=self.project)
+        self.project.delete()
+        data = self._sync(since=token)
+        self.assertEqual(self._uuids(data['tasks']), {str(other_task.uuid)})
+        self.assertTrue(data['projects'][0]['is_deleted'])
+        self.assertEqual(data['time_entries'], [])
+
+    def test_hard_deleted_tasks_are_tombstoned(self):
+        token = self._sync()['token']
+        entry_uuid = self.task.time_entries.get().uuid
+        self.task.delete()
+        data = self._sync(since=token)
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual([str(uuid) for uuid in data['deleted']['tasks']], [str(self.task.uuid)])
+        self.assertEqual([str(uuid) for uuid in data['deleted']['time_entries']], [str(entry_uuid)])
+
+    def test_changes_are_paginated(self):
+        data = self._sync(limit=1)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['projects']), 1)
+        data = self._sync(since=data['token'], limit=1000)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(self._uuids(data['tasks']), {str(self.task.uuid)})
+
+    def _interleave_transactions(self):
+        """Log a task of a transaction which is still committing, then one of a transaction which has committed
+
+        Return the change log rows of the first transaction, which are not visible until it commits.
+        """
+        late_task = Task.objects.create(title="Task B", project=self.project)
+        late_changes = list(ChangeLogEntry.objects.filter(object_uuid=late_task.uuid))
+        ChangeLogEntry.objects.filter(pk__in=[change.pk for change in late_changes]).delete()
+        Task.objects.create(title="Task C", project=self.project)
+        return late_changes
+
+    def test_changes_committed_late_are_not_skipped(self):
+        token = self._sync()['token']
+        late_changes = self._interleave_transactions()
+        data = self._sync(since=token)
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['token'], token)
+        # The first transaction commits
+        ChangeLogEntry.objects.bulk_create(late_changes)
+        data = self._sync(since=data['token'])
+        self.assertEqual({task['title'] for task in data['tasks']}, {"Task B", "Task C"})
+
+    @override_settings(SYNC_SETTLE_SECONDS=0)
+    def test_rolled_back_changes_are_skipped_once_settled(self):
+        token = self._sync()['token']
+        self._interleave_transactions()
+        self.assertEqual({task['title'] for task in self._sync(since=token)['tasks']}, {"Task C"})
+
+    def test_offline_operations_are_applied_before_sync(self):
+        task = Task.objects.create(title="Task B", project=self.project)
+        token = self._sync()['token']
+        start = timezone.now() - timedelta(minutes=5)
+        response = self.client.post(self.url, {
+            'since': token,
+            'operations': [{'task': str(task.uuid), 'action': 'start', 'timestamp': start.isoformat()}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['status'], 'started')
+        self.assertEqual(self._uuids(response.data['tasks']), {str(task.uuid)})
+        self.assertTrue(response.data['tasks'][0]['is_running'])
+        self.assertEqual(response.data['time_entries'][0]['end'], None)
+
+
+class StopAllTasksTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project_a = Project.objects.create(title="Project A", created_by=self.user)
+        self.project_b = Project.objects.create(title="Project B", created_by=self.user)
+        self.task_a = Task.objects.create(title="Task A", project=self.project_a)
+        self.task_b = Task.objects.create(title="Task B", project=self.project_b)
+        self.task_a.start()
+        self.task_b.start()
+        self.client.force_authenticate(self.user)
+
+    def test_stop_all_tasks_of_project(self):
+        url = reverse('project:project_apis-stop-all-tasks', kwargs={'uuid': self.project_a.uuid})
+        response = self.client.put(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task['uuid'] for task in response.data['stopped_tasks']], [str(self.task_a.uuid)])
+        self.assertIsInstance(response.data['stopped_tasks'][0]['duration'], int)
+        self.assertEqual(self.client.put(url).status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_stop_all_tasks_of_user(self):
+        other_user = User.objects.create(email="dummy_email_b@gmail.com", is_active=True)
+        other_task = Task.objects.create(title="Task C", project=Project.objects.create(title="C", created_by=other_user))
+        other_task.start()
+        response = self.client.put(reverse('project:project_apis-stop-all-user-tasks'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {task['uuid'] for task in response.data['stopped_tasks']}, {str(self.task_a.uuid), str(self.task_b.uuid)}
+        )
+        other_task.refresh_from_db()
+        self.assertTrue(other_task.is_running())
+
+
+class PaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.client.force_authenticate(self.user)
+
+    def _collect_pages(self, url, page_size):
+        items = []
+        url = f'{url}?page_size={page_size}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            items += response.data['results']
+            url = response.data['next']
+        return items
+
+    def test_projects_are_paginated_newest_first(self):
+        projects = [Project.objects.create(title=f"Project {index}", created_by=self.user) for index in range(5)]
+        items = self._collect_pages(reverse('project:project_apis-list'), page_size=2)
+        self.assertEqual([item['uuid'] for item in items], [str(project.uuid) for project in reversed(projects)])
+
+    def test_tasks_created_at_the_same_time_are_not_skipped(self):
+        project = Project.objects.create(title="Project", created_by=self.user)
+        tasks = [Task.objects.create(title=f"Task {index}", project=project) for index in range(5)]
+        Task.objects.update(created_at=tasks[0].created_at)
+        url = reverse('project:task_apis-list', kwargs={'project__uuid': project.uuid})
+        items = self._collect_pages(url, page_size=2)
+        self.assertEqual(sorted(item['uuid'] for item in items), sorted(str(task.uuid) for task in tasks))
+
+    def test_time_entries_are_paginated(self):
+        project = Project.objects.create(title="Project", created_by=self.user)
+        task = Task.objects.create(title="Task", project=project)
+        for _ in range(3):
+            task.start()
+            task.stop()
+        url = reverse('project:task_apis-time-entries', kwargs={'project__uuid': project.uuid, 'uuid': task.uuid})
+        items = self._collect_pages(url, page_size=2)
+        self.assertEqual(len(items), 3)
+
+
+class TimeEntryExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+        self.finished_entry = TaskTimeEntry.objects.create(task=self.task)
+        self.finished_entry.end_datetime = self.finished_entry.start_datetime + timedelta(seconds=10)
+        self.finished_entry.save()
+        self.task.start()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project:project_apis-export-time-entries', kwargs={'uuid': self.project.uuid})
+
+    def _export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_csv(self):
+        lines = self._export(format='csv').splitlines()
+        self.assertEqual(lines[0], 'uuid,task,task_title,start,end,duration')
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(f'{self.finished_entry.uuid},{self.task.uuid},Task A,'))
+        self.assertTrue(lines[1].endswith(',10'))
+        self.assertTrue(lines[2].endswith(',,'))
+
+    def test_export_ndjson(self):
+        rows = [json.loads(line) for line in self._export(format='ndjson').splitlines()]
+        self.assertEqual([row['duration'] for row in rows], [10, None])
+        self.assertEqual(rows[0]['uuid'], str(self.finished_entry.uuid))
+
+    def test_export_filters_by_start_datetime(self):
+        lines = self._export(**{'format': 'csv', 'from': self.task.running_since.isoformat()}).splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_export_other_users_project_is_not_found(self):
+        other_user = User.objects.create(email="dummy_email_b@gmail.com", is_active=True)
+        self.client.force_authenticate(other_user)
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TimeEntryExportStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.token = Token.objects.create(user=self.user)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+        self.task.start()
+        self.path = reverse('project:project_apis-export-time-entries', kwargs={'uuid': self.project.uuid})
+
+    async def _get(self, query_string):
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'method': 'GET', 'path': self.path, 'query_string': query_string.encode(),
+            'headers': [(b'authorization', f'Token {self.token.key}'.encode())],
+        })
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(1)
+        body = b''
+        while True:
+            message = await communicator.receive_output(1)
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return start, body.decode()
+
+    async def test_export_is_streamed_under_asgi(self):
+        start, body = await self._get('format=csv')
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/csv; charset=utf-8'), start['headers'])
+        lines = body.splitlines()
+        self.assertEqual(lines[0], 'uuid,task,task_title,start,end,duration')
+        self.assertTrue(lines[1].startswith(f'{(await self.task.time_entries.aget()).uuid},{self.task.uuid},'))
+
+    async def test_invalid_filters_and_formats_are_rejected(self):
+        self.assertEqual((await self._get('format=xml'))[0]['status'], 404)
+        self.assertEqual((await self._get('format=csv&from=yesterday'))[0]['status'], 400)
+
+
+class TimeEntryBulkImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com", is_active=True)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('project:time_entry_bulk_import')
+
+    def test_import_csv(self):
+        body = (
+            "project,task,start,end\n"
+            "Project A,Task A,2022-09-12T10:00:00Z,2022-09-12T10:00:10Z\n"
+            "Project A,Task A,2022-09-12T10:00:05Z,2022-09-12T10:00:20Z\n"
+        )
+        response = self.client.post(self.url, body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertEqual(response.data['rejected'][0]['line'], 3)
+        self.assertEqual(TaskTimeEntry.objects.filter(task__project__created_by=self.user).count(), 1)
+
+    def test_import_ndjson(self):
+        body = '{"project": "Project A", "task": "Task A", "start": "2022-09-12T10:00:00Z", "end": "2022-09-12T10:00:10Z"}\n'
+        response = self.client.post(f'{self.url}?create_missing=false', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 0)
+        self.assertEqual(len(response.data['rejected']), 1)
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework import routers
 from .views import ProjectViewSet
-from .views import TaskViewSet
+from .views import TaskViewSet, SyncView, TaskBatchView, TimeEntryBulkImportView
+from . import async_views
 
 
 app_name = 'project'
@@ -10,9 +11,17 @@ app_name = 'project'
 project_router = routers.DefaultRouter()
 project_router.register('', ProjectViewSet, basename='project_apis')
 # For nested urls, I used regex instead of the `alanjds/drf-nested-routers` library to minimize third-party libraries usage
-project_router.register('(?P<project__uuid>[^/.]+)/tasks', TaskViewSet, basename='task_apis')
+# Only valid UUIDs are matched, as `TaskViewSet` filters tasks by the project's uuid directly
+UUID_PATTERN = '[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+project_router.register(f'(?P<project__uuid>{UUID_PATTERN})/tasks', TaskViewSet, basename='task_apis')
 
 
 urlpatterns = [
-    path('projects/', include(project_router.urls))
+    path('projects/', include(project_router.urls)),
+    path('async/projects/', async_views.project_list, name='async_project_list'),
+    path('async/projects/<uuid:project_uuid>/tasks/', async_views.task_list, name='async_task_list'),
+    path('async/timers/', async_views.timer_status, name='async_timer_status'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('tasks/batch/', TaskBatchView.as_view(), name='task_batch'),
+    path('time-entries/bulk/', TimeEntryBulkImportView.as_view(), name='time_entry_bulk_import'),
 ]
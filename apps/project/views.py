@@ -1,29 +1,63 @@
-from rest_framework import viewsets, response, status
+from django.db import IntegrityError
+from django.db.models import Max, Sum
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, views, response, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from apps.core.mixins import CachedResponseMixin, ConditionalGetMixin
 from apps.core.permissions import IsObjectCreator
-from apps.core.mixins import MultipleFieldLookupMixin
 from .models import Project, Task
-from .serializers import ProjectSeriailzer, TaskSerializer
-from .services import StopAllTasksService, StartTaskService
+from .parsers import CSVParser, NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import (
+    ProjectSeriailzer, ProjectStatsSerializer, TaskSerializer, TaskTimeEntrySerializer, StoppedTaskSerializer, TimeEntryExportQuerySerializer, TimeEntryImportQuerySerializer,
+    ImportResultSerializer, TaskBatchSerializer, TaskOperationResultSerializer, SyncQuerySerializer, SyncEditsSerializer,
+    SyncResultSerializer
+)
+from .services import (
+    StopAllTasksService, StopAllUserTasksService, StartTaskService, ExportTimeEntriesService, ImportTimeEntriesService,
+    BatchTaskOperationsService, SyncChangesService
+)
 from .exceptions import CuncurrentTaskException, NoRunningTaskFoundException
 
 
 def is_task_creator():
     return IsObjectCreator('project__created_by')
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSeriailzer
     permission_classes = (IsAuthenticated, IsObjectCreator, )
     lookup_field = "uuid"
 
     def get_queryset(self):
-        qs = Project.objects.user_projects(self.request.user)
+        qs = Project.objects.user_projects(self.request.user).select_related('created_by')
         deleted = self.request.GET.get('deleted')
         if self.action != 'restore' and not deleted:
             qs = qs.non_deleted()
+        if self._include_stats():
+            qs = qs.with_stats()
         return qs
 
+    def get_serializer_class(self):
+        if self._include_stats():
+            return ProjectStatsSerializer
+        return super().get_serializer_class()
+
+    def get_list_validators(self, queryset):
+        # Stats change with the projects' tasks, which are validated by their latest `updated_at` (start, stop and
+        # edits of a task update it) and their count (deleted tasks)
+        last_modified, count = super().get_list_validators(queryset)
+        if not self._include_stats():
+            return last_modified, count
+        stats = queryset.order_by().aggregate(last_activity=Max('last_activity_at'), task_count=Sum('task_count'))
+        last_modified = max(filter(None, (last_modified, stats['last_activity'])), default=None)
+        return last_modified, f"{count}:{stats['task_count']}"
+
+    def _include_stats(self):
+        # Only lists are annotated, details are validated by the project's own `updated_at`
+        return self.action == 'list' and self.request.GET.get('include') == 'stats'
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
@@ -37,29 +71,71 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(methods=['PUT'], detail=True, url_path='stop-all-tasks')
     def stop_all_tasks(self, request, uuid):
         project = self.get_object()
+        return self._stop_tasks(StopAllTasksService(project=project))
+
+    @action(methods=['PUT'], detail=False, url_path='stop-all-tasks')
+    def stop_all_user_tasks(self, request):
+        return self._stop_tasks(StopAllUserTasksService(user=request.user))
+
+    def _stop_tasks(self, service):
         try:
-            service = StopAllTasksService(project=project)
             stopped_tasks = service.execute()
-            return response.Response({"stopped_tasks": stopped_tasks})
+            return response.Response({"stopped_tasks": StoppedTaskSerializer(stopped_tasks, many=True).data})
         except NoRunningTaskFoundException:
             return response.Response("No Running Task found", status=status.HTTP_204_NO_CONTENT)
 
-class TaskViewSet(MultipleFieldLookupMixin, viewsets.ModelViewSet):
+    @action(
+        methods=['GET'], detail=True, url_path='time-entries/export', renderer_classes=(CSVRenderer, NDJSONRenderer)
+    )
+    def export_time_entries(self, request, uuid):
+        project = self.get_object()
+        query = TimeEntryExportQuerySerializer(data=request.GET)
+        query.is_valid(raise_exception=True)
+        service = ExportTimeEntriesService(
+            project=project,
+            date_from=query.validated_data.get('from'),
+            date_to=query.validated_data.get('to'),
+        )
+        renderer = request.accepted_renderer
+        export = StreamingHttpResponse(
+            renderer.stream(service.COLUMNS, service.execute()),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        export['Content-Disposition'] = f'attachment; filename="{project.slug}-time-entries.{renderer.format}"'
+        return export
+
+class TaskViewSet(CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated, is_task_creator)
     serializer_class = TaskSerializer
-    lookup_fields = ['project__uuid', 'uuid']
     lookup_field = 'uuid'
+    _project = None
 
     def get_queryset(self):
-        project = self._get_project()
-        return Task.objects.filter(project__created_by=self.request.user, project=project)
+        # Scoped by the project's uuid and owner in the same query, so a task is fetched along with its project
+        # without resolving the project first
+        return Task.objects.filter(
+            project__uuid=self.kwargs['project__uuid'], project__created_by=self.request.user
+        ).with_tracking_stats()
+
+    def get_list_validators(self, queryset):
+        # Tasks are serialized along with their project. Resolving it also answers 404 for other users' projects,
+        # before anything is listed or cached
+        last_modified, count = super().get_list_validators(queryset)
+        return max(filter(None, (last_modified, self._get_project().updated_at))), count
+
+    def get_object_timestamps(self, instance):
+        return [instance.updated_at, instance.project.updated_at]
 
     def perform_create(self, serializer):
         serializer.save(project=self._get_project())
 
     def _get_project(self):
-        project_uuid = self.kwargs.get('project__uuid')
-        return Project.objects.get(uuid=project_uuid)
+        """Return the user's project of the url, once per request, or raise `Http404`"""
+        if self._project is None:
+            self._project = get_object_or_404(
+                Project.objects.user_projects(self.request.user), uuid=self.kwargs['project__uuid']
+            )
+        return self._project
 
     @action(methods=['PATCH'], detail=True)
     def start(self, request, project__uuid, uuid):
@@ -71,14 +147,76 @@ class TaskViewSet(MultipleFieldLookupMixin, viewsets.ModelViewSet):
             return response.Response({'error': 'You cannot start multiple tasks at the same time'}, status=status.HTTP_400_BAD_REQUEST)
         return response.Response(status=status.HTTP_200_OK)
 
+    @action(methods=['GET'], detail=True, url_path='time-entries')
+    def time_entries(self, request, project__uuid, uuid):
+        task = self.get_object()
+        page = self.paginate_queryset(task.time_entries.all())
+        serializer = TaskTimeEntrySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(methods=['PATCH'], detail=True)
     def stop(self, request, project__uuid, uuid):
         task = self.get_object()
         task.stop()
+        return response.Response(status=status.HTTP_200_OK)
+
+
+class TimeEntryBulkImportView(views.APIView):
+    permission_classes = (IsAuthenticated, )
+    parser_classes = (CSVParser, NDJSONParser)
+
+    def post(self, request):
+        query = TimeEntryImportQuerySerializer(data=request.GET.dict())
+        query.is_valid(raise_exception=True)
+        service = ImportTimeEntriesService(user=request.user, rows=request.data, **query.validated_data)
+        result = service.execute()
+        return response.Response(ImportResultSerializer(result).data, status=status.HTTP_201_CREATED)
+
+
+class TaskBatchView(views.APIView):
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request):
+        serializer = TaskBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        service = BatchTaskOperationsService(user=request.user, operations=serializer.validated_data['operations'])
         try:
-            service = StartTaskService(task=task)
-            service.execute()
-        except CuncurrentTaskException:
-            return response.Response()
+            results = service.execute()
+        except IntegrityError:
+            # Another request started or stopped some of the tasks in the meantime, nothing was applied
+            return response.Response(
+                {'error': 'Tasks were changed by another request, please retry'}, status=status.HTTP_409_CONFLICT
+            )
+        return response.Response({'results': TaskOperationResultSerializer(results, many=True).data})
+
+
+class SyncView(views.APIView):
+    """Return the changes of the user's projects, tasks and time entries since the `since` token of the client
 
+    A POST also applies the client's offline timer operations, like `TaskBatchView`, before reading the changes, so
+    they come back in the same response.
+    """
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request):
+        query = SyncQuerySerializer(data=request.GET)
+        query.is_valid(raise_exception=True)
+        return response.Response(self._changes(query.validated_data))
+
+    def post(self, request):
+        serializer = SyncEditsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        service = BatchTaskOperationsService(user=request.user, operations=serializer.validated_data['operations'])
+        try:
+            results = service.execute() if service.operations else []
+        except IntegrityError:
+            return response.Response(
+                {'error': 'Tasks were changed by another request, please retry'}, status=status.HTTP_409_CONFLICT
+            )
+        data = self._changes(serializer.validated_data)
+        data['results'] = TaskOperationResultSerializer(results, many=True).data
+        return response.Response(data)
 
+    def _changes(self, query):
+        service = SyncChangesService(user=self.request.user, since=query['since'], limit=query['limit'])
+        return SyncResultSerializer(service.execute()).data
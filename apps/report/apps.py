@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ReportConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.report'
+
+    def ready(self):
+        from . import receivers  # noqa: F401
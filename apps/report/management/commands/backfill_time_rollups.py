@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.report.services import BackfillTimeRollupsService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily time rollups from finished time entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Number of time entries to read per chunk')
+
+    def handle(self, *args, **options):
+        processed = BackfillTimeRollupsService(chunk_size=options['chunk_size']).execute()
+        self.stdout.write(self.style.SUCCESS(f'{processed} time entries rolled up'))
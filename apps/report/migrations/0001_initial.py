@@ -0,0 +1,40 @@
+# Generated by Django 4.1.1 on 2026-10-18 02:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('project', '0003_task_tracking_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('seconds', models.BigIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to='project.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to='project.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'time_rollup',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timerollup',
+            index=models.Index(fields=['user', 'day'], name='time_rollup_user_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timerollup',
+            constraint=models.UniqueConstraint(fields=('user', 'project', 'task', 'day'), name='time_rollup_unique_key'),
+        ),
+    ]
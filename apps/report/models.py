@@ -0,0 +1,94 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.db import models, transaction, IntegrityError
+from django.utils import timezone
+
+
+def split_by_day(start, end):
+    """Split the `[start, end)` span into local calendar days and yield `(day, seconds)` for each of them
+
+    Seconds are whole numbers which sum up to the whole seconds of the span, so rollups match task durations.
+    """
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    elapsed = 0
+    piece_start = start
+    while piece_start < end:
+        next_midnight = timezone.make_aware(datetime.combine(piece_start.date() + timedelta(days=1), time.min))
+        piece_end = min(end, next_midnight)
+        elapsed_until_end = int((piece_end - start).total_seconds())
+        yield piece_start.date(), elapsed_until_end - elapsed
+        elapsed = elapsed_until_end
+        piece_start = piece_end
+
+
+class TimeRollupQuerySet(models.QuerySet):
+    def user_rollups(self, user):
+        return self.filter(user=user)
+
+    def add_entries(self, entries):
+        """Add the durations of finished entries (`FinishedEntry` tuples) to their daily rollups
+
+        Existing rollups are locked and read by a single query, then updated and created in bulk.
+        """
+        seconds_per_key = defaultdict(int)
+        for entry in entries:
+            for day, seconds in split_by_day(entry.start, entry.end):
+                if seconds:
+                    seconds_per_key[(entry.user_id, entry.project_id, entry.task_id, day)] += seconds
+        if seconds_per_key:
+            self._add_seconds(seconds_per_key)
+
+    def _add_seconds(self, seconds_per_key):
+        existing_rollups = {
+            (rollup.user_id, rollup.project_id, rollup.task_id, rollup.day): rollup
+            for rollup in self.select_for_update().filter(
+                task_id__in={key[2] for key in seconds_per_key}, day__in={key[3] for key in seconds_per_key}
+            )
+        }
+        updated_rollups, new_rollups = [], []
+        for key, seconds in seconds_per_key.items():
+            if key in existing_rollups:
+                rollup = existing_rollups[key]
+                rollup.seconds += seconds
+                updated_rollups.append(rollup)
+            else:
+                user_id, project_id, task_id, day = key
+                new_rollups.append(
+                    self.model(user_id=user_id, project_id=project_id, task_id=task_id, day=day, seconds=seconds)
+                )
+        self.bulk_update(updated_rollups, ['seconds'])
+        try:
+            with transaction.atomic():
+                self.bulk_create(new_rollups)
+        except IntegrityError:
+            # Another transaction created some of these rollups in the meantime, they are found by the next attempt
+            self._add_seconds({
+                (rollup.user_id, rollup.project_id, rollup.task_id, rollup.day): rollup.seconds
+                for rollup in new_rollups
+            })
+
+
+class TimeRollup(models.Model):
+    """Tracked seconds of a task in a single day
+
+    Rollups are updated when time entries are finished. Changes to already finished entries are not reflected, run
+    `manage.py backfill_time_rollups` to rebuild them from the time entries.
+    """
+    user = models.ForeignKey('user.User', on_delete=models.CASCADE, related_name='time_rollups')
+    project = models.ForeignKey('project.Project', on_delete=models.CASCADE, related_name='time_rollups')
+    task = models.ForeignKey('project.Task', on_delete=models.CASCADE, related_name='time_rollups')
+    day = models.DateField()
+    seconds = models.BigIntegerField(default=0)
+    objects = TimeRollupQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'time_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'project', 'task', 'day'), name='time_rollup_unique_key'),
+        ]
+        indexes = [
+            models.Index(fields=('user', 'day'), name='time_rollup_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} @ {self.day}: {self.seconds} sec(s)"
@@ -0,0 +1,8 @@
+from django.dispatch import receiver
+from apps.project.signals import time_entries_finished
+from .models import TimeRollup
+
+
+@receiver(time_entries_finished)
+def add_finished_entries_to_rollups(sender, entries, **kwargs):
+    TimeRollup.objects.add_entries(entries)
@@ -0,0 +1,27 @@
+from rest_framework import serializers
+from apps.core.instrumentation import InstrumentedSerializerMixin
+
+
+class ReportQuerySerializer(serializers.Serializer):
+    """Validate report query parameters: `from`, `to`, `period` and `project`"""
+    period = serializers.ChoiceField(choices=('day', 'week', 'month'), default='day')
+    project = serializers.UUIDField(required=False)
+
+    def get_fields(self):
+        # `from` is a python keyword, so the date range fields cannot be declared as class attributes
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField()
+        fields['to'] = serializers.DateField()
+        return fields
+
+    def validate(self, attrs):
+        if attrs['from'] > attrs['to']:
+            raise serializers.ValidationError({'to': '`to` must not be before `from`'})
+        return attrs
+
+
+class ReportRowSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    period = serializers.DateField()
+    project = serializers.UUIDField(source='project__uuid')
+    project_title = serializers.CharField(source='project__title')
+    seconds = serializers.IntegerField()
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from apps.core.base import AbstractService
+from apps.project.models import ArchivedTimeEntry, FinishedEntry, TaskTimeEntry
+from .models import TimeRollup
+
+
+class TimeReportService(AbstractService):
+    """Sum up a user's tracked seconds per period and project between `date_from` and `date_to` (inclusive)
+
+    `period` is one of `day`, `week` or `month`. Weeks start on Monday.
+    """
+    PERIODS = {
+        'day': F('day'),
+        'week': TruncWeek('day'),
+        'month': TruncMonth('day'),
+    }
+    user = None
+    date_from = None
+    date_to = None
+    period = 'day'
+    project_uuid = None
+
+    def execute(self):
+        rollups = TimeRollup.objects.user_rollups(self.user).filter(day__gte=self.date_from, day__lte=self.date_to)
+        if self.project_uuid:
+            rollups = rollups.filter(project__uuid=self.project_uuid)
+        return list(
+            rollups.annotate(period=self.PERIODS[self.period])
+            .values('period', 'project__uuid', 'project__title')
+            .annotate(seconds=Sum('seconds'))
+            .order_by('period', 'project__title')
+        )
+
+
+class BackfillTimeRollupsService(AbstractService):
+    """Rebuild all time rollups from finished and archived time entries, reading `chunk_size` entries at a time
+
+    The rebuild runs in a single transaction, so reports never see a half built table. Return the number of
+    processed time entries.
+    """
+    chunk_size = 5000
+
+    def execute(self):
+        task_fields = ('task_id', 'task__uuid', 'task__project_id', 'task__project__created_by_id')
+        live_entries = TaskTimeEntry.objects.filter(end_datetime__isnull=False).values_list(
+            'pk', *task_fields, 'created_at', 'end_datetime'
+        )
+        archived_entries = ArchivedTimeEntry.objects.values_list('pk', *task_fields, 'start_datetime', 'end_datetime')
+        with transaction.atomic():
+            TimeRollup.objects.all().delete()
+            return self._merge_chunks(live_entries) + self._merge_chunks(archived_entries)
+
+    def _merge_chunks(self, entries):
+        entries = entries.order_by('pk')
+        processed = 0
+        last_pk = 0
+        while True:
+            chunk = [FinishedEntry(*values) for values in entries.filter(pk__gt=last_pk)[:self.chunk_size]]
+            if not chunk:
+                return processed
+            TimeRollup.objects.add_entries(chunk)
+            processed += len(chunk)
+            last_pk = chunk[-1].entry_id
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.project.models import FinishedEntry, Project, Task, TaskTimeEntry
+from apps.project.services import ArchiveTimeEntriesService
+from apps.user.models import User
+from ..models import TimeRollup, split_by_day
+from ..services import BackfillTimeRollupsService
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class SplitByDayTests(TestCase):
+    def test_span_within_a_day_is_not_split(self):
+        pieces = list(split_by_day(aware(2022, 9, 12, 10), aware(2022, 9, 12, 11)))
+        self.assertEqual(pieces, [(aware(2022, 9, 12).date(), 3600)])
+
+    def test_span_crossing_midnight_is_split(self):
+        pieces = list(split_by_day(aware(2022, 9, 12, 23, 30), aware(2022, 9, 14, 0, 15)))
+        self.assertEqual(pieces, [
+            (aware(2022, 9, 12).date(), 1800),
+            (aware(2022, 9, 13).date(), 86400),
+            (aware(2022, 9, 14).date(), 900),
+        ])
+
+
+class TimeRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email@gmail.com")
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        self.task = Task.objects.create(title="Task A", project=self.project)
+
+    def _start_at(self, start):
+        self.task.start()
+        TaskTimeEntry.objects.filter(task=self.task).running().update(created_at=start)
+
+    def test_stopping_task_updates_rollups(self):
+        self._start_at(timezone.now() - timedelta(seconds=30))
+        self.task.stop()
+        rollup = TimeRollup.objects.get()
+        self.assertEqual(rollup.seconds, 30)
+        self.assertEqual((rollup.user, rollup.project, rollup.task), (self.user, self.project, self.task))
+
+    def test_stop_all_tasks_splits_entries_crossing_midnight(self):
+        midnight = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+        self._start_at(midnight - timedelta(seconds=20))
+        TaskTimeEntry.objects.filter(task__project=self.project).finish_running(midnight + timedelta(seconds=10))
+        rollups = dict(TimeRollup.objects.values_list('day', 'seconds'))
+        self.assertEqual(rollups, {(midnight - timedelta(days=1)).date(): 20, midnight.date(): 10})
+
+    def test_finishing_entries_adds_up_in_the_same_rollup(self):
+        for seconds in (10, 20):
+            tte = TaskTimeEntry.objects.create(task=self.task)
+            tte.end_datetime = tte.start_datetime + timedelta(seconds=seconds)
+            tte.save()
+        self.assertEqual(TimeRollup.objects.get().seconds, 30)
+
+    def test_entries_are_added_to_rollups_in_bulk(self):
+        def entry(day, seconds):
+            start = aware(2022, 9, day, 10)
+            end = start + timedelta(seconds=seconds)
+            return FinishedEntry(None, self.task.pk, self.task.uuid, self.project.pk, self.user.pk, start, end)
+
+        TimeRollup.objects.add_entries([entry(1, 10)])
+        with CaptureQueriesContext(connection) as context:
+            TimeRollup.objects.add_entries([entry(day, 5) for day in range(1, 29)])
+        # Existing rollups are read, updated and missing ones created, whatever the number of days
+        self.assertLessEqual(len(context.captured_queries), 5)
+        rollups = dict(TimeRollup.objects.values_list('day', 'seconds'))
+        self.assertEqual(len(rollups), 28)
+        self.assertEqual(rollups[aware(2022, 9, 1).date()], 15)
+        self.assertEqual(rollups[aware(2022, 9, 28).date()], 5)
+
+    def test_backfill_rebuilds_rollups(self):
+        tte = TaskTimeEntry.objects.create(task=self.task, end_datetime=timezone.now())
+        TaskTimeEntry.objects.filter(pk=tte.pk).update(created_at=tte.end_datetime - timedelta(seconds=40))
+        TimeRollup.objects.update(seconds=0)
+        self.task.start()
+        self.assertEqual(BackfillTimeRollupsService(chunk_size=1).execute(), 1)
+        self.assertEqual(TimeRollup.objects.get().seconds, 40)
+
+    def test_backfill_includes_archived_entries(self):
+        tte = TaskTimeEntry.objects.create(task=self.task, end_datetime=timezone.now())
+        TaskTimeEntry.objects.filter(pk=tte.pk).update(created_at=tte.end_datetime - timedelta(seconds=40))
+        ArchiveTimeEntriesService(before=timezone.now()).execute()
+        TimeRollup.objects.update(seconds=0)
+        self.assertEqual(BackfillTimeRollupsService().execute(), 1)
+        self.assertEqual(TimeRollup.objects.get().seconds, 40)
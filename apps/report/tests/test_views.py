@@ -0,0 +1,40 @@
+from datetime import date
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.project.models import Project, Task
+from apps.user.models import User
+from ..models import TimeRollup
+
+
+class ReportViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="dummy_email_a@gmail.com", is_active=True)
+        other_user = User.objects.create(email="dummy_email_b@gmail.com", is_active=True)
+        self.project = Project.objects.create(title="Project A", created_by=self.user)
+        other_project = Project.objects.create(title="Project B", created_by=other_user)
+        task = Task.objects.create(title="Task A", project=self.project)
+        other_task = Task.objects.create(title="Task B", project=other_project)
+        for day, seconds in ((date(2022, 9, 12), 10), (date(2022, 9, 13), 20), (date(2022, 9, 19), 40)):
+            TimeRollup.objects.create(user=self.user, project=self.project, task=task, day=day, seconds=seconds)
+        TimeRollup.objects.create(user=other_user, project=other_project, task=other_task, day=date(2022, 9, 12), seconds=80)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('report:reports')
+
+    def test_daily_report(self):
+        response = self.client.get(self.url, {'from': '2022-09-12', 'to': '2022-09-13'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_seconds'], 30)
+        self.assertEqual([row['seconds'] for row in response.data['results']], [10, 20])
+
+    def test_weekly_report(self):
+        response = self.client.get(self.url, {'from': '2022-09-01', 'to': '2022-09-30', 'period': 'week'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['period'], row['seconds']) for row in response.data['results']],
+            [('2022-09-12', 30), ('2022-09-19', 40)]
+        )
+
+    def test_invalid_range_is_rejected(self):
+        response = self.client.get(self.url, {'from': '2022-09-13', 'to': '2022-09-12'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import ReportView
+
+
+app_name = 'report'
+
+
+urlpatterns = [
+    path('reports/', ReportView.as_view(), name='reports'),
+]
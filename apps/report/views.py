@@ -0,0 +1,24 @@
+from rest_framework import views, response
+from rest_framework.permissions import IsAuthenticated
+from .serializers import ReportQuerySerializer, ReportRowSerializer
+from .services import TimeReportService
+
+
+class ReportView(views.APIView):
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request):
+        query = ReportQuerySerializer(data=request.GET)
+        query.is_valid(raise_exception=True)
+        service = TimeReportService(
+            user=request.user,
+            date_from=query.validated_data['from'],
+            date_to=query.validated_data['to'],
+            period=query.validated_data['period'],
+            project_uuid=query.validated_data.get('project'),
+        )
+        rows = service.execute()
+        return response.Response({
+            'total_seconds': sum(row['seconds'] for row in rows),
+            'results': ReportRowSerializer(rows, many=True).data,
+        })
@@ -0,0 +1,51 @@
+from hashlib import sha256
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from apps.core.cache import is_shared_cache
+
+
+# Credentials of users are never written to the cache
+UNCACHED_USER_FIELDS = ('password', 'activation_key')
+
+
+def token_cache_key(key):
+    # Raw tokens are credentials, so they are not used as cache keys as is
+    return f'auth-token:{sha256(key.encode()).hexdigest()}'
+
+
+def invalidate_cached_tokens(*keys):
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication which keeps a snapshot of the token's user in the cache for `AUTH_TOKEN_CACHE_TTL` seconds
+
+    Only tokens of active users are cached, and only when the default cache is shared by all server processes, so
+    invalidating an entry reaches every process. Entries are invalidated when the token is deleted or rotated and when
+    its user is saved, which covers logout, deactivation and password changes. Users changed by `QuerySet.update()`
+    keep their cached snapshot until it expires.
+
+    Snapshots leave out `UNCACHED_USER_FIELDS`. Users restored from them have these fields deferred, so reading one
+    loads it from the database and saving the user doesn't overwrite it.
+    """
+    def authenticate_credentials(self, key):
+        if not is_shared_cache():
+            return super().authenticate_credentials(key)
+        cache_key = token_cache_key(key)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            fields, created = cached
+            user_model = get_user_model()
+            user = user_model.from_db(router.db_for_read(user_model), list(fields), list(fields.values()))
+            return user, Token(key=key, user=user, created=created)
+        user, token = super().authenticate_credentials(key)
+        fields = {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields if field.name not in UNCACHED_USER_FIELDS
+        }
+        cache.set(cache_key, (fields, token.created), settings.AUTH_TOKEN_CACHE_TTL)
+        return user, token
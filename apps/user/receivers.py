@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from apps.core.cache import bump_data_version
+from .authentication import invalidate_cached_tokens
+from .models import User
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    invalidate_cached_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_tokens(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_cached_tokens(*Token.objects.filter(user=instance).values_list('key', flat=True))
+
+
+@receiver(post_save, sender=User)
+def bump_user_data_version(sender, instance, **kwargs):
+    # Users are serialized as owners of their projects, and a new user may reuse the id of a deleted one
+    bump_data_version(instance.pk)
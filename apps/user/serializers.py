@@ -1,6 +1,7 @@
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
 from rest_framework import serializers
+from apps.core.instrumentation import InstrumentedSerializerMixin
 from .models import User
 
 
@@ -28,7 +29,7 @@ class LoginSerializer(serializers.Serializer):
         return validated_data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('email', 'first_name', 'last_name')
@@ -1,7 +1,8 @@
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from apps.core.base import AbstractService
+from apps.core.models import OutgoingEmail
 from .exceptions import InvalidActivationKey
 from .models import User
 
@@ -13,13 +14,14 @@ class RegisterUserService(AbstractService):
     last_name = None
 
     def execute(self):
-        user = User.objects.create_user(
-            email=self.email,
-            password=self.password,
-            first_name=self.first_name,
-            last_name=self.last_name
-        )
-        self._send_activation_email(user)
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email=self.email,
+                password=self.password,
+                first_name=self.first_name,
+                last_name=self.last_name
+            )
+            self._send_activation_email(user)
         return user
 
     def _send_activation_email(self, user):
@@ -27,7 +29,8 @@ class RegisterUserService(AbstractService):
         message = f'Hello {user.email}, thank you for using our app. Please follow this link to activate your account: {user.get_activation_url()}'
         email_from = settings.EMAIL_FROM
         recipient_list = [user.email, ]
-        send_mail( subject, message, email_from, recipient_list )
+        # Queued in the outbox and sent by `manage.py send_queued_emails`, so registration doesn't wait for SMTP
+        OutgoingEmail.objects.enqueue(subject, message, email_from, recipient_list)
 
 
 class ActivateUserService(AbstractService):
@@ -1,11 +1,23 @@
 from datetime import timedelta
 from django.test import TestCase
 from django.conf import settings
-from ..services import ActivateUserService
+from apps.core.models import OutgoingEmail
+from ..services import ActivateUserService, RegisterUserService
 from ..models import User
 from ..exceptions import InvalidActivationKey
 
 
+class RegisterUserServiceTests(TestCase):
+    def test_activation_email_is_queued(self):
+        user = RegisterUserService(
+            email='dummy@mail.com', password='P@ssw0rd!@#', first_name='Mohsen', last_name='Hassani'
+        ).execute()
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients, [user.email])
+        self.assertIn(user.get_activation_url(), email.message)
+        self.assertEqual(email.status, OutgoingEmail.QUEUED)
+
+
 class ActivateUserServiceTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
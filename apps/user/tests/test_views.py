@@ -1,9 +1,15 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from ..views import RegisterView
+from ..authentication import token_cache_key
 from ..models import User
+from apps.core.testing import override_shared_cache
 
 
 COMMON_PASSWORD = 'P@ssw0rd'
@@ -74,4 +80,67 @@ class UserLoginTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('token', response.data)
 
-    
+
+@override_shared_cache()
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='dummy@email.com', is_active=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('user:profile')
+
+    def test_authenticated_requests_hit_the_cache(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_deactivation_invalidates_the_cache(self):
+        self.client.get(self.url)
+        self.user.deactivate()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_the_cache(self):
+        self.client.get(self.url)
+        self.user.set_password(f'{COMMON_PASSWORD}!@#')
+        self.user.first_name = 'Changed'
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).data['first_name'], 'Changed')
+
+    def test_logout_deletes_the_token(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.post(reverse('user:logout')).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_credentials_are_not_cached(self):
+        self.client.get(self.url)
+        fields, _ = cache.get(token_cache_key(self.token.key))
+        self.assertEqual(fields['email'], self.user.email)
+        self.assertNotIn('password', fields)
+        self.assertNotIn('activation_key', fields)
+
+    def test_profile_update_keeps_the_password(self):
+        self.user.set_password(COMMON_PASSWORD)
+        self.user.save()
+        self.client.get(self.url)
+        response = self.client.patch(self.url, {'first_name': 'Changed'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Changed')
+        self.assertTrue(self.user.check_password(COMMON_PASSWORD))
+
+
+class ProcessLocalTokenCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='dummy@email.com', is_active=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_tokens_are_not_cached_in_a_process_local_cache(self):
+        self.assertEqual(self.client.get(reverse('user:profile')).status_code, status.HTTP_200_OK)
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework.authtoken.views import obtain_auth_token
-from .views import ActivateUser, ProfileView, RegisterView
+from .views import ActivateUser, LogoutView, ProfileView, RegisterView
 
 
 app_name = 'user'
@@ -8,6 +8,7 @@ app_name = 'user'
 
 urlpatterns = [
     path('login/', obtain_auth_token, name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
     path('profile/', ProfileView.as_view(), name='profile'),
     path('register/', RegisterView.as_view(), name='register'),
     path('activate/<key>/', ActivateUser.as_view(), name='activate_account'),
@@ -1,4 +1,5 @@
 from rest_framework import generics, views, response, status
+from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from apps.user.exceptions import InvalidActivationKey
 from .serializers import UserSerializer, RegisterSerializer
@@ -48,4 +49,12 @@ class ActivateUser(views.APIView):
         except InvalidActivationKey:
             return response.Response({"message": "Activation Key is invalid"}, status=status.HTTP_400_BAD_REQUEST)
         return response.Response({"message": "Your account is activated"})
-        
+
+
+class LogoutView(views.APIView):
+    """Delete the token of the request, so it cannot be used anymore"""
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request):
+        Token.objects.filter(key=request.auth.key).delete()
+        return response.Response(status=status.HTTP_204_NO_CONTENT)
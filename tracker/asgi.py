@@ -8,9 +8,28 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 """
 
 import os
+import re
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tracker.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tracker.settings.base')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up. Streams are served outside of Django, which cannot stream asynchronously
+from apps.project.streams import TimeEntryExportStream, TimerEventsStream  # noqa: E402
+from apps.project.urls import UUID_PATTERN  # noqa: E402
+
+streams = [
+    (re.compile(r'/api/v1/events/'), TimerEventsStream()),
+    (re.compile(rf'/api/v1/projects/(?P<uuid>{UUID_PATTERN})/time-entries/export/'), TimeEntryExportStream()),
+]
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http':
+        for pattern, stream in streams:
+            match = pattern.fullmatch(scope['path'])
+            if match:
+                return await stream({**scope, 'url_route': {'kwargs': match.groupdict()}}, receive, send)
+    await django_application(scope, receive, send)
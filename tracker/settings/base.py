@@ -32,12 +32,14 @@ THIRD_PARTY_APPS = [
 PROJECT_APPS = [
     'apps.user',
     'apps.project',
+    'apps.report',
     'apps.core',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + PROJECT_APPS
 
 MIDDLEWARE = [
+    'apps.core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +95,30 @@ AUTH_USER_MODEL = 'user.User'
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_FROM = 'admin@tracker.com'
 USER_ACTIVATION_EXPIRATION = timedelta(minutes=5)
+# Seconds a token's user is kept in the cache by `CachedTokenAuthentication`, tokens are only cached by a cache backend
+# shared by all server processes
+AUTH_TOKEN_CACHE_TTL = config("AUTH_TOKEN_CACHE_TTL", default=300, cast=int)
+
+# Seconds list and detail responses of projects and tasks are cached for, see `apps.core.mixins.CachedResponseMixin`.
+# Responses are only cached by a cache backend shared by all server processes (e.g. Redis or Memcached)
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", default=300, cast=int)
+
+# Milliseconds `SingletonMixin.load()` trusts its process-local instance before comparing its `updated_at` with the
+# database, i.e. how long other processes may take to see a saved setting
+SINGLETON_VERSION_CHECK_INTERVAL = config("SINGLETON_VERSION_CHECK_INTERVAL", default=5000, cast=int)
+
+# Seconds after which a change log id missing from `/api/v1/sync/` responses is taken as rolled back rather than still
+# being committed. Keep it above the duration of the longest transaction writing to the change log
+SYNC_SETTLE_SECONDS = config("SYNC_SETTLE_SECONDS", default=10, cast=int)
+
+# Backend delivering timer events to `/api/v1/events/` streams, see `apps.project.events.LocalEventBroker`
+TIMER_EVENTS_BROKER = config("TIMER_EVENTS_BROKER", default='apps.project.events.LocalEventBroker')
+
+# Per-request query and timing instrumentation, see `apps.core.middleware.InstrumentationMiddleware`
+INSTRUMENTATION_ENABLED = config("INSTRUMENTATION_ENABLED", default=False, cast=bool)
+INSTRUMENTATION_SLOW_REQUEST_MS = config("INSTRUMENTATION_SLOW_REQUEST_MS", default=500, cast=int)
+INSTRUMENTATION_MAX_QUERIES = config("INSTRUMENTATION_MAX_QUERIES", default=50, cast=int)
+INSTRUMENTATION_WINDOW = config("INSTRUMENTATION_WINDOW", default=1000, cast=int)
 
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -107,8 +133,10 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAdminUser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',  
+        'apps.user.authentication.CachedTokenAuthentication',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 try:
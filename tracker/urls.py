@@ -4,5 +4,7 @@ from django.urls import path, include
 urlpatterns = [
     path('api/v1/', include('apps.project.urls', namespace='project')),
     path('api/v1/accounts/', include('apps.user.urls', namespace='user')),
+    path('api/v1/', include('apps.report.urls', namespace='report')),
+    path('api/v1/', include('apps.core.urls', namespace='core')),
     path('admin/', admin.site.urls),
 ]